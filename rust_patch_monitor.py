@@ -6,30 +6,235 @@ A tool to monitor and analyze Rust for Linux patches from the kernel mailing lis
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import click
-from datetime import datetime, timedelta
+import contextlib
+import hashlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, List, Dict, Optional
+from urllib.parse import urlparse
+from xml.sax.saxutils import escape, quoteattr
 import re
 import anthropic
+import ijson
 import json
 import os
+import threading
+import time
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+# Patchwork fetches are network-bound, so a small thread pool hides most of the round-trip latency
+MAX_FETCH_WORKERS = 8
+
+# Concurrent Claude requests in analyze-bulk, kept low to stay clear of API rate limits
+MAX_ANALYSIS_WORKERS = 4
+
+# Keep enough pooled keep-alive connections for the fetch workers, and retry transient server errors
+HTTP_POOL_SIZE = 32
+HTTP_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"],
+)
+
+# Only request the fields we read; the heavy content/diff/headers fields are skipped
+SERIES_FIELDS = "id,name,date,submitter,total,patches,cover_letter,web_url"
+PATCH_FIELDS = "id,name,date,submitter,state,web_url,mbox"
+
+# Upper bound on how much of each patch mbox is downloaded; prompts only use the first few KB
+MBOX_MAX_BYTES = 64 * 1024
+
+# Write buffer for JSON exports, large enough that a typical export is flushed in a few syscalls
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+# On-disk cache for the project id, patch content and comments, so repeat runs skip most HTTP
+# traffic. Patches are effectively immutable once posted; comments keep arriving, so expire sooner.
+CACHE_DIR = os.environ.get(
+    "RUST_PATCH_MONITOR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "rust-patch-monitor")
+)
+PROJECT_CACHE_TTL = timedelta(days=1)
+PATCH_CACHE_TTL = timedelta(days=7)
+COMMENTS_CACHE_TTL = timedelta(hours=1)
+CACHE_MAX_AGE = max(PROJECT_CACHE_TTL, PATCH_CACHE_TTL, COMMENTS_CACHE_TTL)  # Older entries are pruned
+
+# Patchwork patch states that mean a patch has landed or been replaced
+APPLIED_STATES = frozenset({"accepted", "committed", "superseded"})
+
+# Endorsement trailers such as "Signed-off-by: Jane Doe <jane@example.com>", one per line;
+# captures the trailer kind and the name with any trailing <email> and CRLF line ending stripped
+TRAILER_RE = re.compile(
+    r"^[ \t]*(signed-off-by|acked-by|reviewed-by|tested-by):[^\S\r\n]*(.*?)[^\S\r\n]*(?:<[^>\r\n]+>[^\r\n]*)?\r?$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Engagement key for each (lowercased) trailer kind, in report order
+TRAILER_KEYS = {
+    "signed-off-by": "signed_off_by",
+    "acked-by": "acked_by",
+    "reviewed-by": "reviewed_by",
+    "tested-by": "tested_by",
+}
+
+# Status keywords looked for in Claude's analysis, in priority order
+STATUS_KEYWORDS = (("ready", "Ready"), ("stall", "Stalled"), ("strategic", "Strategic Development"))
+STATUS_RE = re.compile("|".join(keyword for keyword, _ in STATUS_KEYWORDS), re.IGNORECASE)
+
+# Numeric fields of an analysis result's token_usage, summed across a bulk run
+TOKEN_COUNT_KEYS = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+
+# Placeholder patch entries for the web UI analysis, sliced per series and shared between records
+PATCH_PLACEHOLDERS = [{"id": i, "name": f"Patch {i}", "description": "See full report"} for i in range(1, 4)]
+
+# First line after a commit message in an mbox: the "---" separator or, failing that, the diff
+MESSAGE_END_RE = re.compile(r"^(?:---\r?$|diff --git)", re.MULTILINE)
+
+# Series revision such as "[v3]" or "v3" in a series name, as a whole word so "v4l2" is not v4
+VERSION_RE = re.compile(r"\bv(\d+)\b", re.IGNORECASE)
+
+# Name in a single "Kind: Name <email>" line: everything after the first colon, up to any <email>
+ENDORSEMENT_NAME_RE = re.compile(r"[^:]*:\s*(.*?)\s*(?:<[^>]+>.*)?\Z", re.DOTALL)
+
+
+_SHARED_SESSION: Optional[requests.Session] = None
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide Patchwork session, creating it on first use"""
+    global _SHARED_SESSION
+
+    if _SHARED_SESSION is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=HTTP_RETRY)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["User-Agent"] = "rust-patch-monitor"
+        # Session defaults already keep connections alive and accept every compression urllib3 can
+        # decode (gzip and deflate, plus br/zstd when brotli/zstandard are installed)
+        _SHARED_SESSION = session
+
+    return _SHARED_SESSION
+
+
+def _parse_date(value: str) -> datetime:
+    """Parse a Patchwork ISO 8601 timestamp, accepting a trailing "Z" for UTC"""
+    if value.endswith("Z"):
+        return datetime.fromisoformat(value[:-1]).replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(value)
+
+
+def _utcnow() -> datetime:
+    """Current time in UTC; the single clock read behind engagement and activity ages"""
+    return datetime.now(timezone.utc)
+
+
+def _localnow() -> datetime:
+    """Current local wall-clock time (naive) for report dates and stamps, read from the same module clock"""
+    return _utcnow().astimezone().replace(tzinfo=None)
+
+
+def _commit_message_lines(mbox_response: requests.Response, max_bytes: Optional[int] = None):
+    """Yield raw mbox lines up to the "---" separator (or first diff) that ends the commit message
+
+    Reading also stops once max_bytes have been consumed, for mails such as pull requests that have neither.
+    """
+    consumed = 0
+    for line in mbox_response.iter_lines():
+        if line == b"---" or line.startswith(b"diff --git"):
+            return
+        yield line
+        consumed += len(line) + 1
+        if max_bytes is not None and consumed >= max_bytes:
+            return
+
+
+def _commit_message(content: str) -> str:
+    """Return the part of an mbox before the "---" separator (or first diff) that ends the commit message"""
+    match = MESSAGE_END_RE.search(content)
+    return content[: match.start()] if match else content
+
+
+def _json(response: requests.Response):
+    """Decode a JSON response body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _status_from_analysis(analysis_text: str) -> str:
+    """Derive a coarse web UI status from keywords in Claude's analysis"""
+    # One case-insensitive scan; keyword priority is applied afterwards, not by match position
+    found = {match.group(0).lower() for match in STATUS_RE.finditer(analysis_text)}
+    return next((status for keyword, status in STATUS_KEYWORDS if keyword in found), "Under Review")
+
+
+def _total_token_usage(analysis_results: Iterable[Dict]) -> Counter:
+    """Sum the token counts of analysis results in one pass; missing counts are 0"""
+    totals = Counter()
+    for result in analysis_results:
+        usage = result.get("token_usage", {})
+        totals.update({key: usage[key] for key in TOKEN_COUNT_KEYS if key in usage})
+    return totals
+
+
+def _dumps(obj, pretty: bool = False) -> bytes:
+    """Encode an object as compact (or indented) JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(obj, indent=2, default=str).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _write_json_export(path, metadata: Dict, patch_series: Iterable[Dict], pretty: bool = False) -> None:
+    """Write a {"metadata": ..., "patch_series": [...]} export one series record at a time"""
+    # Compact output for the web UI by default; pretty puts each record on its own indented block
+    newline, space = (b"\n", b" ") if pretty else (b"", b"")
+
+    # Write to a temporary file first so a failure part-way never leaves truncated JSON behind
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb", buffering=EXPORT_BUFFER_SIZE) as f:
+            f.write(b"{" + newline + b'"metadata":' + space + _dumps(metadata, pretty))
+            f.write(b"," + newline + b'"patch_series":' + space + b"[")
+            for i, series_data in enumerate(patch_series):
+                f.write((b"," if i else b"") + newline + _dumps(series_data, pretty))
+            f.write(newline + b"]" + newline + b"}\n")
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Remove the partial temporary file too, so a failed export leaves nothing behind
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+# __slots__ is spelled out (rather than dataclass(slots=True)) to keep Python 3.8 support
 @dataclass
 class PatchSeries:
+    __slots__ = ("id", "name", "date", "submitter", "total", "patches", "cover_letter", "web_url")
+
     id: int
     name: str
     date: datetime
     submitter: Dict
     total: int
-    patches: List[Dict]
+    patches: List[Dict]  # May hold only the first few entries; `total` is the full count
     cover_letter: Optional[Dict]
     web_url: str
 
 
 @dataclass
 class Patch:
+    __slots__ = ("id", "name", "date", "submitter", "content", "state", "web_url", "mbox_url")
+
     id: int
     name: str
     date: datetime
@@ -40,12 +245,100 @@ class Patch:
     mbox_url: str
 
 
+def _series_record(series: PatchSeries, engagement: Dict) -> Dict:
+    """Build the per-series record shared by the JSON exports"""
+    return {
+        "id": series.id,
+        "name": series.name,
+        "date": series.date.isoformat(),
+        "submitter": {
+            "name": (series.submitter.get("name", "Unknown") if series.submitter else "Unknown"),
+            "email": (series.submitter.get("email", "") if series.submitter else ""),
+        },
+        "total_patches": series.total,
+        "web_url": series.web_url,
+        "engagement": engagement,
+    }
+
+
+def _instance_cache_name(base_url: str) -> str:
+    """Cache subdirectory name for a Patchwork instance: its host plus a short hash of the full API URL"""
+    digest = hashlib.sha256(base_url.encode("utf-8")).hexdigest()[:12]
+    return f"{urlparse(base_url).netloc or 'patchwork'}-{digest}"
+
+
 class PatchworkClient:
-    def __init__(self, base_url="https://patchwork.kernel.org/api"):
+    def __init__(
+        self,
+        base_url="https://patchwork.kernel.org/api",
+        session: Optional[requests.Session] = None,
+        cache_dir: Optional[str] = None,
+    ):
         self.base_url = base_url
-        self.session = requests.Session()
+        self.session = session if session is not None else get_session()
+        # None disables the on-disk cache. Entries are kept per Patchwork instance, since patch
+        # and comment ids (and the project id) only mean something on the server they came from.
+        self.cache_dir = None if cache_dir is None else os.path.join(cache_dir, _instance_cache_name(base_url))
+        self._comments_cache: Dict[int, List[Dict]] = {}
+        self._project_id = None
+        self._cache_pruned = False
+
+    def _read_cache(self, name: str, ttl: timedelta):
+        """Return a cached JSON entry if it exists and is younger than ttl"""
+        if self.cache_dir is None:
+            return None
+
+        path = os.path.join(self.cache_dir, name)
+        try:
+            if time.time() - os.path.getmtime(path) > ttl.total_seconds():
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, name: str, data) -> None:
+        """Store a JSON entry in the on-disk cache, ignoring write failures"""
+        if self.cache_dir is None:
+            return
+        if not self._cache_pruned:
+            self._prune_cache()
+
+        path = os.path.join(self.cache_dir, name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)  # Atomic, so concurrent fetch workers never see partial files
+        except OSError:
+            pass
+
+    def _prune_cache(self) -> None:
+        """Delete cache entries older than the longest TTL, once per client, so the directory stays bounded"""
+        self._cache_pruned = True
+        max_age = CACHE_MAX_AGE.total_seconds()
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and time.time() - entry.stat().st_mtime > max_age:
+                        os.remove(entry.path)
+        except OSError:
+            pass
 
     def get_rust_for_linux_project_id(self):
+        """Find the specific Rust for Linux project ID, looking it up only once per client and per day"""
+        if self._project_id is None:
+            cached = self._read_cache("project-id.json", PROJECT_CACHE_TTL)
+            if cached is not None:
+                self._project_id = cached["id"]
+            else:
+                self._project_id = self._find_rust_for_linux_project_id()
+                self._write_cache("project-id.json", {"id": self._project_id})
+        return self._project_id
+
+    def _find_rust_for_linux_project_id(self):
         """Find the specific Rust for Linux project ID"""
 
         # Since rust-for-linux project exists but isn't in the API list,
@@ -61,7 +354,7 @@ class PatchworkClient:
             response = self.session.get(f"{self.base_url}/projects/")
             response.raise_for_status()
 
-            projects = response.json()
+            projects = _json(response)
             print(f"Searching through {len(projects)} projects for Rust for Linux...")
 
             # Look for any rust-related project
@@ -97,29 +390,38 @@ class PatchworkClient:
         if "[git,pull]" in patch_name or "git pull" in patch_name:
             return True
 
-        # Look for state information in the patch data
-        states = []
-        for patch in patches[:3]:  # Check first 3 patches
+        # Look for state information in the patch data; if the majority of
+        # patches that have a state are applied, consider the series applied
+        sample = patches[:3]  # Check first 3 patches
+        applied_count = 0
+        state_count = 0
+
+        for index, patch in enumerate(sample):
             state = patch.get("state")
-            if state:
-                states.append(state.lower())
+            if not state:
+                continue
+
+            state_count += 1
+            if state.lower() in APPLIED_STATES:
+                applied_count += 1
 
-        if states:
-            # If we have state information, use it
-            applied_states = {"accepted", "committed", "superseded"}
-            applied_count = sum(1 for state in states if state in applied_states)
+                # Stop early once no remaining patch could overturn the majority
+                if applied_count > (state_count + len(sample) - index - 1) * 0.5:
+                    return True
 
-            # If majority are applied, consider series applied
-            if applied_count > len(states) * 0.5:
-                return True
+        return applied_count > state_count * 0.5
 
-        return False
+    def get_recent_series(
+        self, project_id, days: int = 90, include_applied: bool = False, max_patches: Optional[int] = None
+    ) -> List[PatchSeries]:
+        """Get patch series from the Rust for Linux project in the last N days, optionally excluding applied series
 
-    def get_recent_series(self, project_id, days: int = 90, include_applied: bool = False) -> List[PatchSeries]:
-        """Get patch series from the Rust for Linux project in the last N days, optionally excluding applied series"""
-        cutoff_date = datetime.now() - timedelta(days=days)
+        If max_patches is given, each series only keeps its first max_patches patch entries.
+        """
+        # Patchwork dates are UTC, and are compared below as naive UTC datetimes
+        cutoff_date = (_utcnow() - timedelta(days=days)).replace(tzinfo=None)
 
-        params = {"project": project_id, "ordering": "-date", "per_page": 50}
+        params = {"project": project_id, "ordering": "-date", "per_page": 50, "fields": SERIES_FIELDS}
 
         series_list = []
         page = 1
@@ -128,51 +430,58 @@ class PatchworkClient:
         filter_text = "all patches" if include_applied else "PENDING patches"
         print(f"Searching Rust for Linux project for {filter_text} in last {days} days...")
 
+        # Pages are fetched one after another on purpose: whether page N+1 is needed at all is
+        # only known once page N has been read, and a typical window spans one or two pages
         while True:
             params["page"] = page
-            response = self.session.get(f"{self.base_url}/series/", params=params)
-            response.raise_for_status()
 
-            data = response.json()
-
-            if not data:
-                break
+            # Results are ordered newest first, so once one series falls outside
+            # the window the rest of this page and every later page will too
+            reached_cutoff = False
+            page_size = 0
 
-            for series_data in data:
-                try:
-                    series_date = datetime.fromisoformat(series_data["date"].replace("Z", "+00:00"))
-                    # Convert to timezone-naive for comparison
-                    if series_date.tzinfo:
-                        series_date = series_date.replace(tzinfo=None)
+            # Decode the page incrementally so we can stop reading at the cutoff
+            with self.session.get(f"{self.base_url}/series/", params=params, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
 
-                    if series_date < cutoff_date:
+                for series_data in ijson.items(response.raw, "item"):
+                    page_size += 1
+                    try:
+                        series_date = _parse_date(series_data["date"])
+                        # Convert to timezone-naive UTC for comparison
+                        if series_date.tzinfo:
+                            series_date = series_date.astimezone(timezone.utc).replace(tzinfo=None)
+
+                        if series_date < cutoff_date:
+                            reached_cutoff = True
+                            break
+
+                        # Handle missing or None submitter
+                        submitter = series_data.get("submitter") or {}
+
+                        # Check if the series has been applied by examining patch states
+                        patches = series_data.get("patches", [])
+                        if not include_applied and self._is_series_applied(patches):
+                            applied_count += 1
+                            continue  # Skip applied series
+
+                        series = PatchSeries(
+                            id=series_data["id"],
+                            name=series_data.get("name", "Untitled"),
+                            date=series_date,
+                            submitter=submitter,
+                            total=series_data.get("total", 0),
+                            patches=patches if max_patches is None else patches[:max_patches],
+                            cover_letter=series_data.get("cover_letter"),
+                            web_url=series_data.get("web_url", ""),
+                        )
+                        series_list.append(series)
+                    except Exception:
+                        # Skip series with data issues
                         continue
 
-                    # Handle missing or None submitter
-                    submitter = series_data.get("submitter") or {}
-
-                    # Check if the series has been applied by examining patch states
-                    patches = series_data.get("patches", [])
-                    if not include_applied and self._is_series_applied(patches):
-                        applied_count += 1
-                        continue  # Skip applied series
-
-                    series = PatchSeries(
-                        id=series_data["id"],
-                        name=series_data.get("name", "Untitled"),
-                        date=series_date,
-                        submitter=submitter,
-                        total=series_data.get("total", 0),
-                        patches=patches,
-                        cover_letter=series_data.get("cover_letter"),
-                        web_url=series_data.get("web_url", ""),
-                    )
-                    series_list.append(series)
-                except Exception:
-                    # Skip series with data issues
-                    continue
-
-            if len(data) < 50:  # Last page
+            if reached_cutoff or page_size < 50:  # Last page we need
                 break
             page += 1
 
@@ -180,41 +489,106 @@ class PatchworkClient:
             print(f"Excluded {applied_count} applied patch series")
         return series_list
 
-    def get_patch_content(self, patch_id: int) -> Patch:
-        """Get detailed patch content including mbox"""
-        response = self.session.get(f"{self.base_url}/patches/{patch_id}/")
-        response.raise_for_status()
+    def get_patch_content(
+        self, patch_id: int, max_bytes: Optional[int] = MBOX_MAX_BYTES, message_only: bool = False
+    ) -> Patch:
+        """Get detailed patch content including mbox, reading at most max_bytes of it (None for all)
+
+        With message_only, the mbox is read only up to the end of the commit message, which
+        holds every endorsement trailer, and the diff is never downloaded. max_bytes still applies.
+        """
+        cache_name = f"patch-{patch_id}-{'message-' if message_only else ''}{max_bytes or 'full'}.json"
+        cached = self._read_cache(cache_name, PATCH_CACHE_TTL)
+
+        if cached is not None:
+            patch_data, content = cached["patch"], cached["content"]
+        else:
+            response = self.session.get(f"{self.base_url}/patches/{patch_id}/", params={"fields": PATCH_FIELDS})
+            response.raise_for_status()
+
+            patch_data = _json(response)
 
-        patch_data = response.json()
+            # Stream the mbox and stop after max_bytes; only its head is ever analyzed
+            with self.session.get(patch_data["mbox"], stream=True) as mbox_response:
+                mbox_response.raise_for_status()
+                if message_only:
+                    mbox_content = b"\n".join(_commit_message_lines(mbox_response, max_bytes))[:max_bytes]
+                elif max_bytes is None:
+                    mbox_content = mbox_response.content
+                else:
+                    mbox_content = mbox_response.raw.read(max_bytes, decode_content=True)
+                content = mbox_content.decode(mbox_response.encoding or "utf-8", errors="replace")
 
-        # Fetch mbox content
-        mbox_response = self.session.get(patch_data["mbox"])
-        mbox_response.raise_for_status()
+            self._write_cache(cache_name, {"patch": patch_data, "content": content})
 
         return Patch(
             id=patch_data["id"],
             name=patch_data["name"],
-            date=datetime.fromisoformat(patch_data["date"].replace("Z", "+00:00")),
+            date=_parse_date(patch_data["date"]),
             submitter=patch_data["submitter"],
-            content=mbox_response.text,
+            content=content,
             state=patch_data["state"],
             web_url=patch_data["web_url"],
             mbox_url=patch_data["mbox"],
         )
 
     def get_patch_comments(self, patch_id: int) -> List[Dict]:
-        """Get comments/discussion for a specific patch"""
+        """Get comments/discussion for a specific patch, cached per patch id"""
+        if patch_id in self._comments_cache:
+            return self._comments_cache[patch_id]
+
+        cache_name = f"comments-{patch_id}.json"
+        comments = self._read_cache(cache_name, COMMENTS_CACHE_TTL)
+        if comments is not None:
+            self._comments_cache[patch_id] = comments
+            return comments
+
         try:
             response = self.session.get(f"{self.base_url}/patches/{patch_id}/comments/")
             response.raise_for_status()
-            return response.json()
+            comments = _json(response)
+            self._comments_cache[patch_id] = comments
+            self._write_cache(cache_name, comments)
+            return comments
         except Exception:
             return []  # Return empty list if comments can't be fetched
 
+    def get_patches_content(
+        self,
+        patch_ids: List[int],
+        on_error: Optional[Callable[[int, Exception], None]] = None,
+        message_only: bool = False,
+    ) -> List[Patch]:
+        """Fetch several patches concurrently, preserving the order of patch_ids
+
+        If on_error is given, failed fetches are reported through it and skipped;
+        otherwise the first failure is raised. message_only is passed on to get_patch_content.
+        """
+
+        def fetch(patch_id):
+            try:
+                return self.get_patch_content(patch_id, message_only=message_only)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(patch_id, e)
+                return None
+
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            patches = list(executor.map(fetch, patch_ids))
+
+        return [patch for patch in patches if patch is not None]
+
+    def get_patches_comments(self, patch_ids: List[int]) -> List[List[Dict]]:
+        """Fetch comments for several patches concurrently, preserving the order of patch_ids"""
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            return list(executor.map(self.get_patch_comments, patch_ids))
+
 
 class ClaudeAnalyzer:
     def __init__(self, api_key: str):
         self.client = anthropic.Client(api_key=api_key)
+        self._engagement_cache: Dict[tuple, Dict] = {}
 
     def _load_prompt_template(self) -> str:
         """Load the prompt template from the external file"""
@@ -231,77 +605,63 @@ class ClaudeAnalyzer:
         except Exception as e:
             raise Exception(f"Error reading prompt template: {e}")
 
-    def _analyze_engagement(self, series: PatchSeries, patches: List[Patch]) -> Dict:
-        """Analyze community engagement indicators from patches"""
-        from datetime import datetime, timezone
+    def _analyze_engagement(self, series: PatchSeries, patches: List[Patch], now: Optional[datetime] = None) -> Dict:
+        """Analyze community engagement indicators from patches, as of now (UTC, defaults to the current time)
 
-        # Extract version information from series name
-        version_match = re.search(r"\[?v(\d+)\]?", series.name, re.IGNORECASE)
-        current_version = int(version_match.group(1)) if version_match else 1
+        Version and endorsements are memoized per series and patch set; the age is measured from now on every call.
+        """
+        key = (series.id, tuple(patch.id for patch in patches))
+        if key not in self._engagement_cache:
+            self._engagement_cache[key] = self._compute_engagement(series, patches)
+        engagement = self._engagement_cache[key]
 
         # Calculate days since posting
-        now = datetime.now(timezone.utc)
+        if now is None:
+            now = _utcnow()
         series_date = series.date.replace(tzinfo=timezone.utc) if series.date.tzinfo is None else series.date
-        days_since_posting = (now - series_date).days
-
-        # Extract sign-offs and endorsements from all patches
-        endorsements = {
-            "signed_off_by": [],
-            "acked_by": [],
-            "reviewed_by": [],
-            "tested_by": [],
-        }
 
-        for patch in patches:
+        return {
+            "version": engagement["version"],
+            "days_since_posting": (now - series_date).days,
+            "endorsements": engagement["endorsements"],
+        }
 
-            # Find all endorsement lines
-            for line in patch.content.split("\n"):
-                line = line.strip()
+    def _engagement_summary(self, series: PatchSeries, patches: List[Patch], now: Optional[datetime] = None) -> Dict:
+        """Engagement analysis with endorsement names reduced to counts, as used by the JSON exports"""
+        engagement = self._analyze_engagement(series, patches, now)
+        return {
+            "version": engagement["version"],
+            "days_since_posting": engagement["days_since_posting"],
+            "endorsements": {kind: len(names) for kind, names in engagement["endorsements"].items()},
+        }
 
-                if line.lower().startswith("signed-off-by:"):
-                    name = self._extract_name_from_line(line)
-                    if name and name not in endorsements["signed_off_by"]:
-                        endorsements["signed_off_by"].append(name)
+    def _compute_engagement(self, series: PatchSeries, patches: List[Patch]) -> Dict:
+        """Extract the time-independent engagement indicators: series version and endorsements"""
 
-                elif line.lower().startswith("acked-by:"):
-                    name = self._extract_name_from_line(line)
-                    if name and name not in endorsements["acked_by"]:
-                        endorsements["acked_by"].append(name)
+        # Extract version information from series name
+        version_match = VERSION_RE.search(series.name)
+        current_version = int(version_match.group(1)) if version_match else 1
 
-                elif line.lower().startswith("reviewed-by:"):
-                    name = self._extract_name_from_line(line)
-                    if name and name not in endorsements["reviewed_by"]:
-                        endorsements["reviewed_by"].append(name)
+        # Extract sign-offs and endorsements from all patches; dict keys act as
+        # insertion-ordered sets so dedup is O(1) and first-seen order is kept
+        endorsements = {key: {} for key in TRAILER_KEYS.values()}
 
-                elif line.lower().startswith("tested-by:"):
-                    name = self._extract_name_from_line(line)
-                    if name and name not in endorsements["tested_by"]:
-                        endorsements["tested_by"].append(name)
+        # Find all endorsement lines in one regex pass over every commit message; the pattern
+        # never crosses a line break, so joining on newlines cannot create or merge trailers.
+        # Diffs are skipped: they are most of each mbox and their context lines can quote trailers.
+        for kind, name in TRAILER_RE.findall("\n".join(_commit_message(patch.content) for patch in patches)):
+            if name:
+                endorsements[TRAILER_KEYS[kind.lower()]][name] = None
 
         return {
             "version": current_version,
-            "days_since_posting": days_since_posting,
-            "endorsements": endorsements,
+            "endorsements": {kind: list(names) for kind, names in endorsements.items()},
         }
 
     def _extract_name_from_line(self, line: str) -> str:
         """Extract name from endorsement line like 'Acked-by: John Doe <john@example.com>'"""
-
-        # Remove the prefix (e.g., "Acked-by: ")
-        colon_index = line.find(":")
-        if colon_index == -1:
-            return ""
-
-        name_part = line[colon_index + 1 :].strip()
-
-        # Extract name before email if present
-        email_match = re.search(r"<[^>]+>", name_part)
-        if email_match:
-            name = name_part[: email_match.start()].strip()
-        else:
-            name = name_part
-
-        return name
+        match = ENDORSEMENT_NAME_RE.match(line)
+        return match.group(1) if match else ""
 
     def analyze_patchset(
         self,
@@ -313,74 +673,69 @@ class ClaudeAnalyzer:
         max_patch_chars: int = 3000,
     ) -> str:
         """Generate comprehensive analysis of a patchset with community feedback"""
-        from datetime import datetime, timezone
-
-        # Extract engagement metrics
-        engagement_data = self._analyze_engagement(series, patches)
-
-        # Build structured XML-like context
-        patches_xml = []
 
-        for i, patch in enumerate(patches[:max_patches]):
-            patch_xml = f"""    <patch id="{i+1}" name="{patch.name}">
-      <content>
-{patch.content[:max_patch_chars]}
-      </content>"""
+        # One clock reading for both the posting age and the last-activity age
+        now = _utcnow()
 
-            # Fetch and include comments if requested
-            if include_comments and client:
-                comments = client.get_patch_comments(patch.id)
-                if comments:
-                    comments_xml = []
-                    for j, comment in enumerate(comments[:3]):  # Limit to 3 comments per patch
-                        submitter_name = comment.get("submitter", {}).get("name", "Unknown")
-                        comment_date = comment.get("date", "Unknown")[:10]  # Just the date part
-                        comment_content = comment.get("content", "")[:1500]  # Limit comment length
-
-                        comment_xml = f"""        <comment author="{submitter_name}" date="{comment_date}">
-{comment_content}
-        </comment>"""
-                        comments_xml.append(comment_xml)
-
-                    patch_xml += f"""
-      <comments>
-{chr(10).join(comments_xml)}
-      </comments>"""
-                else:
-                    patch_xml += """
-      <comments>
-        <!-- No comments found for this patch -->
-      </comments>"""
-            else:
-                patch_xml += """
-      <comments>
-        <!-- Comments not fetched (--no-comments flag used) -->
-      </comments>"""
+        # Extract engagement metrics
+        engagement_data = self._analyze_engagement(series, patches, now)
 
-            patch_xml += """
-    </patch>"""
-            patches_xml.append(patch_xml)
+        # Fetch comments for all analyzed patches up front, in parallel
+        if include_comments and client:
+            patch_comments = client.get_patches_comments([patch.id for patch in patches[:max_patches]])
+        else:
+            patch_comments = []
 
-        # Count total comments and find most recent activity
+        # Build structured XML-like context, counting comments and finding the
+        # most recent activity in the same pass. Every patch appends its lines to one
+        # flat list so the whole context is joined exactly once below.
+        patch_lines = []
         total_comments = 0
         most_recent_activity = series.date
 
         for i, patch in enumerate(patches[:max_patches]):
+            patch_lines += [
+                f'    <patch id="{i+1}" name={quoteattr(patch.name)}>',
+                "      <content>",
+                escape(patch.content[:max_patch_chars]),
+                "      </content>",
+                "      <comments>",
+            ]
+
+            # Include comments if requested
             if include_comments and client:
-                comments = client.get_patch_comments(patch.id)
+                comments = patch_comments[i]
                 total_comments += len(comments)
 
                 # Track most recent comment date
                 for comment in comments:
                     try:
-                        comment_date = datetime.fromisoformat(comment.get("date", "").replace("Z", "+00:00"))
-                        if comment_date > most_recent_activity:
-                            most_recent_activity = comment_date
+                        activity_date = _parse_date(comment.get("date", ""))
+                        if activity_date > most_recent_activity:
+                            most_recent_activity = activity_date
                     except Exception:
                         pass
 
+                if comments:
+                    for comment in comments[:3]:  # Limit to 3 comments per patch
+                        # Patchwork fields can be null, so fall back on None as well as on missing keys
+                        submitter_name = (comment.get("submitter") or {}).get("name") or "Unknown"
+                        comment_date = (comment.get("date") or "Unknown")[:10]  # Just the date part
+                        comment_content = (comment.get("content") or "")[:1500]  # Limit comment length
+
+                        patch_lines += [
+                            f"        <comment author={quoteattr(submitter_name)} date={quoteattr(comment_date)}>",
+                            escape(comment_content),
+                            "        </comment>",
+                        ]
+                else:
+                    patch_lines.append("        <!-- No comments found for this patch -->")
+            else:
+                patch_lines.append("        <!-- Comments not fetched (no-comments flag used) -->")
+
+            patch_lines += ["      </comments>", "    </patch>"]
+
         # Calculate days since last activity
-        now = datetime.now(timezone.utc)
         last_activity = (
             most_recent_activity.replace(tzinfo=timezone.utc)
             if most_recent_activity.tzinfo is None
@@ -389,50 +744,54 @@ class ClaudeAnalyzer:
         days_since_last_activity = (now - last_activity).days
 
         # Build engagement analysis XML
-        engagement_xml = f"""  <engagement_analysis>
-    <version_info>
-      <current_version>{engagement_data['version']}</current_version>
-      <days_since_posting>{engagement_data['days_since_posting']}</days_since_posting>
-    </version_info>
-    <endorsements>
-      <signed_off_by count="{len(engagement_data['endorsements']['signed_off_by'])}">{
-          ', '.join(engagement_data['endorsements']['signed_off_by'][:5])
-      }</signed_off_by>
-      <acked_by count="{len(engagement_data['endorsements']['acked_by'])}">{
-          ', '.join(engagement_data['endorsements']['acked_by'][:5])
-      }</acked_by>
-      <reviewed_by count="{len(engagement_data['endorsements']['reviewed_by'])}">{
-          ', '.join(engagement_data['endorsements']['reviewed_by'][:5])
-      }</reviewed_by>
-      <tested_by count="{len(engagement_data['endorsements']['tested_by'])}">{
-          ', '.join(engagement_data['endorsements']['tested_by'][:5])
-      }</tested_by>
-    </endorsements>
-    <activity_indicators>
-      <comment_count>{total_comments}</comment_count>
-      <days_since_last_activity>{days_since_last_activity}</days_since_last_activity>
-    </activity_indicators>
-  </engagement_analysis>"""
-
-        # Build the structured XML context
-        analysis_context = f"""<patchset>
-  <metadata>
-    <title>{series.name}</title>
-    <author name="{series.submitter.get('name', 'Unknown')}" email="{series.submitter.get('email', '')}"/>
-    <date>{series.date.strftime('%Y-%m-%d')}</date>
-    <total_patches>{series.total}</total_patches>
-    <analyzed_patches>{min(len(patches), max_patches)}</analyzed_patches>
-    <patchwork_url>{series.web_url}</patchwork_url>
-  </metadata>
-
-{engagement_xml}
-
-  <patches>
-{chr(10).join(patches_xml)}
-  </patches>
-</patchset>"""
-
-        # Load prompt template and format it with context
+        engagement_lines = [
+            "  <engagement_analysis>",
+            "    <version_info>",
+            f"      <current_version>{engagement_data['version']}</current_version>",
+            f"      <days_since_posting>{engagement_data['days_since_posting']}</days_since_posting>",
+            "    </version_info>",
+            "    <endorsements>",
+        ]
+        engagement_lines += [
+            f'      <{kind} count="{len(names)}">{escape(", ".join(names[:5]))}</{kind}>'
+            for kind, names in engagement_data["endorsements"].items()
+        ]
+        engagement_lines += [
+            "    </endorsements>",
+            "    <activity_indicators>",
+            f"      <comment_count>{total_comments}</comment_count>",
+            f"      <days_since_last_activity>{days_since_last_activity}</days_since_last_activity>",
+            "    </activity_indicators>",
+            "  </engagement_analysis>",
+        ]
+
+        # Build the structured XML context, escaping free text so the context stays well-formed
+        author_name = quoteattr(series.submitter.get("name") or "Unknown")
+        author_email = quoteattr(series.submitter.get("email") or "")
+        analysis_context = "\n".join(
+            [
+                "<patchset>",
+                "  <metadata>",
+                f"    <title>{escape(series.name)}</title>",
+                f"    <author name={author_name} email={author_email}/>",
+                f"    <date>{series.date.strftime('%Y-%m-%d')}</date>",
+                f"    <total_patches>{series.total}</total_patches>",
+                f"    <analyzed_patches>{min(len(patches), max_patches)}</analyzed_patches>",
+                f"    <patchwork_url>{escape(series.web_url)}</patchwork_url>",
+                "  </metadata>",
+                "",
+                *engagement_lines,
+                "",
+                "  <patches>",
+                *patch_lines,
+                "  </patches>",
+                "</patchset>",
+            ]
+        )
+
+        # Load prompt template and format it with context. The prompt is not marked for prompt
+        # caching: the shared instructions are well under the model's 1024-token minimum
+        # cacheable prefix, so a cache_control marker would never produce a cache hit.
         prompt_template = self._load_prompt_template()
         prompt = prompt_template.format(analysis_context=analysis_context, series=series)
 
@@ -446,6 +805,8 @@ class ClaudeAnalyzer:
         token_usage = {
             "input_tokens": response.usage.input_tokens,
             "output_tokens": response.usage.output_tokens,
+            "cache_read_input_tokens": getattr(response.usage, "cache_read_input_tokens", None) or 0,
+            "cache_creation_input_tokens": getattr(response.usage, "cache_creation_input_tokens", None) or 0,
             "model": "claude-sonnet-4-20250514",
         }
 
@@ -465,7 +826,7 @@ def list_projects():
 
     response = client.session.get(f"{client.base_url}/projects/")
     response.raise_for_status()
-    projects = response.json()
+    projects = _json(response)
 
     click.echo("All available projects on this Patchwork instance:\n")
     for i, project in enumerate(projects, 1):
@@ -486,7 +847,7 @@ def debug_recent(days):
 
     response = client.session.get(f"{client.base_url}/series/", params=params)
     response.raise_for_status()
-    data = response.json()
+    data = _json(response)
 
     click.echo("Recent patch series (showing titles for debugging):\n")
     for i, series in enumerate(data[:20], 1):
@@ -505,7 +866,7 @@ def list_patches(days, include_applied, claude_key):
 
     try:
         project_id = client.get_rust_for_linux_project_id()
-        series_list = client.get_recent_series(project_id, days, include_applied)
+        series_list = client.get_recent_series(project_id, days, include_applied, max_patches=0)
 
         click.echo(f"Found {len(series_list)} patch series in the last {days} days:\n")
 
@@ -537,11 +898,13 @@ def analyze(days, include_applied, no_comments, max_patches, claude_key, output)
         )
         return
 
-    client = PatchworkClient()
+    client = PatchworkClient(cache_dir=CACHE_DIR)
     analyzer = ClaudeAnalyzer(claude_key)
 
     try:
         project_id = client.get_rust_for_linux_project_id()
+        # Keep every patch entry: endorsements are counted over the whole series, and only
+        # the prompt is limited to max_patches
         series_list = client.get_recent_series(project_id, days, include_applied)
 
         if not series_list:
@@ -566,11 +929,7 @@ def analyze(days, include_applied, no_comments, max_patches, claude_key, output)
 
         # Fetch patch details
         click.echo(f"Fetching patches for: {selected_series.name}")
-        patches = []
-
-        for patch_info in selected_series.patches:
-            patch = client.get_patch_content(patch_info["id"])
-            patches.append(patch)
+        patches = client.get_patches_content([patch_info["id"] for patch_info in selected_series.patches])
 
         # Analyze with Claude
         include_comments = not no_comments
@@ -613,7 +972,8 @@ def analyze(days, include_applied, no_comments, max_patches, claude_key, output)
 @click.option("--no-comments", is_flag=True, help="Skip community comments (faster)")
 @click.option("--summary-report", is_flag=True, help="Generate combined summary report")
 @click.option("--max-patches", default=5, help="Maximum patches per series")
-def analyze_bulk(days, max_series, output_dir, claude_key, no_comments, summary_report, max_patches):
+@click.option("--pretty", is_flag=True, help="Indent the web UI JSON for reading")
+def analyze_bulk(days, max_series, output_dir, claude_key, no_comments, summary_report, max_patches, pretty):
     """Analyze multiple recent patch series in batch"""
     if not claude_key:
         click.echo("Error: Claude API key is required for analysis.", err=True)
@@ -626,12 +986,12 @@ def analyze_bulk(days, max_series, output_dir, claude_key, no_comments, summary_
     import os
     from pathlib import Path
 
-    client = PatchworkClient()
+    client = PatchworkClient(cache_dir=CACHE_DIR)
     analyzer = ClaudeAnalyzer(claude_key)
 
     try:
         project_id = client.get_rust_for_linux_project_id()
-        series_list = client.get_recent_series(project_id, days, include_applied=False)
+        series_list = client.get_recent_series(project_id, days, include_applied=False, max_patches=max_patches)
 
         if not series_list:
             click.echo("No recent patch series found")
@@ -645,86 +1005,93 @@ def analyze_bulk(days, max_series, output_dir, claude_key, no_comments, summary_
 
         # Create output directory
         output_path = Path(output_dir)
-        timestamp_dir = output_path / datetime.now().strftime("%Y-%m-%d")
+        timestamp_dir = output_path / _localnow().strftime("%Y-%m-%d")
         timestamp_dir.mkdir(parents=True, exist_ok=True)
 
         # Track results for summary and web export
         analysis_results = []
         failed_analyses = []
 
-        # Process each series
-        for i, series in enumerate(series_to_analyze, 1):
-            click.echo(f"\n[{i}/{len(series_to_analyze)}] Analyzing: {series.name}")
-
-            try:
-                # Fetch patches
-                click.echo("  Fetching patches...")
-                patches = []
-                for patch_info in series.patches[:max_patches]:
-                    try:
-                        patch = client.get_patch_content(patch_info["id"])
-                        patches.append(patch)
-                    except Exception as e:
-                        click.echo(f"    Warning: Failed to fetch patch {patch_info['id']}: {e}")
-                        continue
+        include_comments = not no_comments
 
-                if not patches:
-                    click.echo("  Error: No patches could be fetched")
-                    failed_analyses.append((series, "No patches available"))
-                    continue
+        def analyze_series(series):
+            """Fetch and analyze one series, returning its patches, result and fetch warnings"""
+            warnings = []
+            patches = client.get_patches_content(
+                [patch_info["id"] for patch_info in series.patches],
+                on_error=lambda patch_id, e: warnings.append(f"Warning: Failed to fetch patch {patch_id}: {e}"),
+            )
+            if not patches:
+                return patches, None, warnings
+
+            result = analyzer.analyze_patchset(
+                series,
+                patches,
+                client=client,
+                include_comments=include_comments,
+                max_patches=max_patches,
+            )
+            return patches, result, warnings
+
+        # Analyze series concurrently, reporting results in the original series order
+        with ThreadPoolExecutor(max_workers=MAX_ANALYSIS_WORKERS) as executor:
+            futures = [executor.submit(analyze_series, series) for series in series_to_analyze]
+
+            for i, (series, future) in enumerate(zip(series_to_analyze, futures), 1):
+                click.echo(f"\n[{i}/{len(series_to_analyze)}] Analyzing: {series.name}")
 
-                # Analyze with Claude
-                include_comments = not no_comments
-                click.echo(f"  Analyzing with Claude ({len(patches)} patches)...")
+                try:
+                    patches, result, warnings = future.result()
+                    for warning in warnings:
+                        click.echo(f"    {warning}")
 
-                result = analyzer.analyze_patchset(
-                    series,
-                    patches,
-                    client=client,
-                    include_comments=include_comments,
-                    max_patches=max_patches,
-                )
+                    if not patches:
+                        click.echo("  Error: No patches could be fetched")
+                        failed_analyses.append((series, "No patches available"))
+                        continue
 
-                analysis_text = result["analysis"]
-                token_usage = result["token_usage"]
-
-                click.echo(f"  📊 Tokens: {token_usage['input_tokens']} in / {token_usage['output_tokens']} out")
-
-                # Save individual analysis
-                filename = f"series-{series.id}.md"
-                filepath = timestamp_dir / filename
-                with open(filepath, "w") as f:
-                    f.write(f"# Analysis: {series.name}\n\n")
-                    f.write(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write(f"**Series ID**: {series.id}\n")
-                    f.write(f"**Author**: {series.submitter.get('name', 'Unknown')}\n")
-                    f.write(f"**Date**: {series.date.strftime('%Y-%m-%d')}\n")
-                    f.write(f"**Patches**: {series.total}\n")
-                    f.write(f"**Patchwork URL**: {series.web_url}\n\n")
-                    f.write(
-                        f"**Token Usage**: {token_usage['input_tokens']} input / "
-                        f"{token_usage['output_tokens']} output\n\n"
+                    click.echo(f"  Analyzed with Claude ({len(patches)} patches)")
+
+                    analysis_text = result["analysis"]
+                    token_usage = result["token_usage"]
+
+                    click.echo(f"  📊 Tokens: {token_usage['input_tokens']} in / {token_usage['output_tokens']} out")
+
+                    # Save individual analysis
+                    filename = f"series-{series.id}.md"
+                    filepath = timestamp_dir / filename
+                    with open(filepath, "w") as f:
+                        f.write(f"# Analysis: {series.name}\n\n")
+                        f.write(f"**Generated**: {_localnow().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                        f.write(f"**Series ID**: {series.id}\n")
+                        f.write(f"**Author**: {series.submitter.get('name', 'Unknown')}\n")
+                        f.write(f"**Date**: {series.date.strftime('%Y-%m-%d')}\n")
+                        f.write(f"**Patches**: {series.total}\n")
+                        f.write(f"**Patchwork URL**: {series.web_url}\n\n")
+                        f.write(
+                            f"**Token Usage**: {token_usage['input_tokens']} input / "
+                            f"{token_usage['output_tokens']} output\n\n"
+                        )
+                        f.write("---\n\n")
+                        f.write(analysis_text)
+
+                    # Store for summary and web export
+                    analysis_results.append(
+                        {
+                            "series": series,
+                            "analysis": analysis_text,
+                            "patches": patches,
+                            "filepath": str(filepath),
+                            "token_usage": token_usage,
+                        }
                     )
-                    f.write("---\n\n")
-                    f.write(analysis_text)
-
-                # Store for summary and web export
-                analysis_results.append(
-                    {
-                        "series": series,
-                        "analysis": analysis_text,
-                        "patches": patches,
-                        "filepath": str(filepath),
-                        "token_usage": token_usage,
-                    }
-                )
 
-                click.echo(f"  ✓ Saved to {filepath}")
+                    click.echo(f"  ✓ Saved to {filepath}")
 
-            except Exception as e:
-                click.echo(f"  ✗ Failed: {e}")
-                failed_analyses.append((series, str(e)))
-                continue
+                except Exception as e:
+                    click.echo(f"  ✗ Failed: {e}")
+                    failed_analyses.append((series, str(e)))
+                    continue
 
         # Generate summary report if requested
         if summary_report:
@@ -733,7 +1100,7 @@ def analyze_bulk(days, max_series, output_dir, claude_key, no_comments, summary_
 
             with open(summary_path, "w") as f:
                 f.write("# Rust for Linux Patch Analysis Summary\n\n")
-                f.write(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"**Generated**: {_localnow().strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write(f"**Period**: Last {days} days\n")
                 f.write(f"**Analyzed**: {len(analysis_results)}/{len(series_to_analyze)} series\n\n")
 
@@ -760,88 +1127,57 @@ def analyze_bulk(days, max_series, output_dir, claude_key, no_comments, summary_
         web_data_path = Path("web-ui/src/data/patches.json")
 
         # Calculate total token usage across all analyses
-        total_input_tokens = sum(result.get("token_usage", {}).get("input_tokens", 0) for result in analysis_results)
-        total_output_tokens = sum(result.get("token_usage", {}).get("output_tokens", 0) for result in analysis_results)
-
-        # Create enhanced export data with analysis summaries and token usage
-        export_data = {
-            "metadata": {
-                "generated_at": datetime.now().isoformat(),
-                "project": "rust-for-linux",
-                "days_back": days,
-                "include_applied": False,
-                "total_series": len(analysis_results),
-                "analysis_method": "claude_bulk",
-                "token_usage": {
-                    "total_input_tokens": total_input_tokens,
-                    "total_output_tokens": total_output_tokens,
-                    "model": "claude-sonnet-4-20250514",
-                    "analysis_count": len(analysis_results),
-                },
+        token_totals = _total_token_usage(analysis_results)
+        total_input_tokens = token_totals["input_tokens"]
+        total_output_tokens = token_totals["output_tokens"]
+
+        # Create enhanced export metadata with token usage
+        metadata = {
+            "generated_at": _localnow().isoformat(),
+            "project": "rust-for-linux",
+            "days_back": days,
+            "include_applied": False,
+            "total_series": len(analysis_results),
+            "analysis_method": "claude_bulk",
+            "token_usage": {
+                "total_input_tokens": total_input_tokens,
+                "total_output_tokens": total_output_tokens,
+                "model": "claude-sonnet-4-20250514",
+                "analysis_count": len(analysis_results),
             },
-            "patch_series": [],
         }
 
-        for result in analysis_results:
-            series = result["series"]
-            patches = result["patches"]
-
-            # Get engagement analysis
-            engagement = analyzer._analyze_engagement(series, patches)
-
-            # Extract key insights from Claude analysis (simplified)
-            analysis_text = result["analysis"]
-            status = "Under Review"  # Default
-            if "ready" in analysis_text.lower():
-                status = "Ready"
-            elif "stall" in analysis_text.lower():
-                status = "Stalled"
-            elif "strategic" in analysis_text.lower():
-                status = "Strategic Development"
-
-            series_data = {
-                "id": series.id,
-                "name": series.name,
-                "date": series.date.isoformat(),
-                "submitter": {
-                    "name": (series.submitter.get("name", "Unknown") if series.submitter else "Unknown"),
-                    "email": (series.submitter.get("email", "") if series.submitter else ""),
-                },
-                "total_patches": series.total,
-                "web_url": series.web_url,
-                "engagement": {
-                    "version": engagement["version"],
-                    "days_since_posting": engagement["days_since_posting"],
-                    "endorsements": {
-                        "signed_off_by": len(engagement["endorsements"]["signed_off_by"]),
-                        "acked_by": len(engagement["endorsements"]["acked_by"]),
-                        "reviewed_by": len(engagement["endorsements"]["reviewed_by"]),
-                        "tested_by": len(engagement["endorsements"]["tested_by"]),
-                    },
-                },
-                "analysis": {
+        # Every record's engagement ages are measured against the same instant
+        now = _utcnow()
+
+        def web_series_records():
+            """Yield one web UI record, with analysis summary, per analyzed series"""
+            for result in analysis_results:
+                series = result["series"]
+                patches = result["patches"]
+
+                # Get engagement analysis
+                engagement = analyzer._engagement_summary(series, patches, now)
+
+                # Extract key insights from Claude analysis (simplified)
+                analysis_text = result["analysis"]
+                status = _status_from_analysis(analysis_text)
+
+                record = _series_record(series, engagement)
+                record["analysis"] = {
                     "status": status,
                     "significance": "Generated by Claude analysis",
                     "summary": analysis_text,
                     "technical_context": "See detailed analysis report",
-                    "patches": [
-                        {
-                            "id": i + 1,
-                            "name": f"Patch {i+1}",
-                            "description": "See full report",
-                        }
-                        for i in range(min(3, len(patches)))
-                    ],
+                    "patches": PATCH_PLACEHOLDERS[: len(patches)],
                     "issues": [],
-                },
-            }
-            export_data["patch_series"].append(series_data)
+                }
+                yield record
 
         # Ensure web-ui directory exists
         web_data_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(web_data_path, "w") as f:
-            json.dump(export_data, f, indent=2, default=str)
+        _write_json_export(web_data_path, metadata, web_series_records(), pretty=pretty)
 
         click.echo(f"✓ Web UI data saved to {web_data_path}")
 
@@ -861,84 +1197,71 @@ def analyze_bulk(days, max_series, output_dir, claude_key, no_comments, summary_
 @click.option("--days", default=90, help="Days to look back for patches")
 @click.option("--include-applied", is_flag=True, help="Include already applied patch series")
 @click.option("--output", "-o", required=True, help="Output JSON file")
-def export_json(days, include_applied, output):
+@click.option("--pretty", is_flag=True, help="Indent the JSON for reading")
+def export_json(days, include_applied, output, pretty):
     """Export patch data as JSON for web UI consumption"""
-    client = PatchworkClient()
+    client = PatchworkClient(cache_dir=CACHE_DIR)
 
     try:
         project_id = client.get_rust_for_linux_project_id()
-        series_list = client.get_recent_series(project_id, days, include_applied)
+        # Only the first 3 patches of each series are used for engagement analysis
+        series_list = client.get_recent_series(project_id, days, include_applied, max_patches=3)
 
         if not series_list:
             click.echo("No recent patch series found")
             return
 
         # Convert series data to JSON-serializable format
-        export_data = {
-            "metadata": {
-                "generated_at": datetime.now().isoformat(),
-                "project": "rust-for-linux",
-                "days_back": days,
-                "include_applied": include_applied,
-                "total_series": len(series_list),
-            },
-            "patch_series": [],
+        metadata = {
+            "generated_at": _localnow().isoformat(),
+            "project": "rust-for-linux",
+            "days_back": days,
+            "include_applied": include_applied,
+            "total_series": len(series_list),
         }
 
         click.echo(f"Exporting {len(series_list)} patch series...")
 
-        for series in series_list:
-            # Get engagement analysis for each series
-            analyzer = ClaudeAnalyzer("dummy-key")  # Just for analysis function
-            try:
-                # Get first few patches for analysis
-                patches = []
-                for patch_ref in series.patches[:3]:  # Limit to first 3 patches
-                    try:
-                        patch = client.get_patch_content(patch_ref["id"])
-                        patches.append(patch)
-                    except Exception:
-                        continue  # Skip failed patches
-
-                engagement = analyzer._analyze_engagement(series, patches)
-            except Exception:
-                engagement = {
-                    "version": 1,
-                    "days_since_posting": 0,
-                    "endorsements": {
-                        "signed_off_by": [],
-                        "acked_by": [],
-                        "reviewed_by": [],
-                        "tested_by": [],
-                    },
-                }
+        analyzer = ClaudeAnalyzer("dummy-key")  # Just for the engagement analysis function
+
+        # Fetch the first few patches of every series through one shared thread pool
+        # Only the commit messages are needed: engagement analysis reads nothing but trailers
+        fetched = client.get_patches_content(
+            [patch_ref["id"] for series in series_list for patch_ref in series.patches],
+            on_error=lambda patch_id, e: None,  # Skip failed patches
+            message_only=True,
+        )
+        patches_by_id = {patch.id: patch for patch in fetched}
+        now = _utcnow()
+
+        def series_records():
+            """Yield one engagement record per series"""
+            for series in series_list:
+                # Get engagement analysis for each series
+                try:
+                    patches = [
+                        patches_by_id[patch_ref["id"]]
+                        for patch_ref in series.patches
+                        if patch_ref["id"] in patches_by_id
+                    ]
+
+                    engagement = analyzer._engagement_summary(series, patches, now)
+                except Exception:
+                    engagement = {
+                        "version": 1,
+                        "days_since_posting": 0,
+                        "endorsements": {
+                            "signed_off_by": 0,
+                            "acked_by": 0,
+                            "reviewed_by": 0,
+                            "tested_by": 0,
+                        },
+                    }
+
+                yield _series_record(series, engagement)
 
-            series_data = {
-                "id": series.id,
-                "name": series.name,
-                "date": series.date.isoformat(),
-                "submitter": {
-                    "name": (series.submitter.get("name", "Unknown") if series.submitter else "Unknown"),
-                    "email": (series.submitter.get("email", "") if series.submitter else ""),
-                },
-                "total_patches": series.total,
-                "web_url": series.web_url,
-                "engagement": {
-                    "version": engagement["version"],
-                    "days_since_posting": engagement["days_since_posting"],
-                    "endorsements": {
-                        "signed_off_by": len(engagement["endorsements"]["signed_off_by"]),
-                        "acked_by": len(engagement["endorsements"]["acked_by"]),
-                        "reviewed_by": len(engagement["endorsements"]["reviewed_by"]),
-                        "tested_by": len(engagement["endorsements"]["tested_by"]),
-                    },
-                },
-            }
-            export_data["patch_series"].append(series_data)
-
-        # Write to JSON file
-        with open(output, "w") as f:
-            json.dump(export_data, f, indent=2, default=str)
+        # Write to JSON file, one series at a time
+        _write_json_export(output, metadata, series_records(), pretty=pretty)
 
         click.echo(f"Data exported to {output}")
 
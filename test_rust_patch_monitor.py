@@ -5,42 +5,165 @@ Tests for Rust Patch Monitor
 Run with: python -m pytest test_rust_patch_monitor.py -v
 """
 
+import itertools
+import json
+import os
 import pytest
+import re
 import responses
-from datetime import datetime, timezone
-from unittest.mock import Mock, patch
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from click.testing import CliRunner
+from unittest.mock import patch
 
 # Import the classes we want to test
 from rust_patch_monitor import PatchworkClient, ClaudeAnalyzer
 
 
+# Plain stand-ins for the parts of an Anthropic messages response that the analyzer reads
+@dataclass
+class _TextBlock:
+    text: str
+
+
+@dataclass
+class _Usage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+
+
+@dataclass
+class _Response:
+    content: list
+    usage: _Usage = field(default_factory=_Usage)
+
+
+# Fixed reference time for test data, so results do not depend on when the suite runs
+FIXED_NOW = datetime(2025, 8, 27, 12, 0, 0, tzinfo=timezone.utc)
+
+# The <patchset> context embedded in a generated prompt
+PATCHSET_RE = re.compile(r"<patchset>.*</patchset>", re.DOTALL)
+
+
+def _parse_patchset(prompt):
+    """Parse the <patchset> element out of a generated prompt, failing if it is missing or malformed"""
+    match = PATCHSET_RE.search(prompt)
+    assert match, "prompt has no <patchset> element"
+    return ET.fromstring(match.group(0))
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    """One analyzer shared by the tests in this module"""
+    return ClaudeAnalyzer("fake-api-key")
+
+
+@pytest.fixture(scope="session")
+def cli_runner():
+    """One Click test runner shared by all CLI invocations"""
+    return CliRunner()
+
+
+@pytest.fixture
+def web_ui_dir(tmp_path, monkeypatch):
+    """Temporary working directory with the web-ui data layout that analyze-bulk writes into"""
+    (tmp_path / "web-ui" / "src" / "data").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(scope="module")
+def _requests_mock():
+    """Patch the requests transport once for the whole module"""
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        yield rsps
+
+
+@pytest.fixture
+def mocked_responses(_requests_mock):
+    """Intercept HTTP requests made through requests, starting each test with no registrations or calls"""
+    _requests_mock.reset()
+    yield _requests_mock
+
+
+@pytest.fixture
+def pw_client():
+    """Fresh Patchwork client per test, as clients memoize the project id and comments"""
+    return PatchworkClient()
+
+
+# Unique ids for test series and patches, as the shared analyzer memoizes engagement by id
+_IDS = itertools.count(1)
+
+
+def _series(**overrides):
+    """Plain attribute container standing in for a fetched PatchSeries"""
+    fields = {
+        "id": next(_IDS),
+        "name": "Test Series",
+        "submitter": {"name": "Test", "email": "test@example.com"},
+        "date": FIXED_NOW,
+        "total": 1,
+        "web_url": "https://example.com",
+        "patches": [{"id": 1, "name": "Test patch"}],
+        "cover_letter": None,
+    }
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def _patch(**overrides):
+    """Plain attribute container standing in for a fetched Patch"""
+    fields = {"id": next(_IDS), "name": "Test Patch", "content": "Test patch content"}
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def _register_patch(mocked_responses, patch_id, mbox_body, **overrides):
+    """Register a Patchwork patch, and the mbox it links to, with the mocked transport"""
+    mbox_url = f"https://example.com/patch/{patch_id}/mbox/"
+    patch_data = {
+        "id": patch_id,
+        "name": f"Patch {patch_id}",
+        "date": "2025-08-20T10:00:00Z",
+        "submitter": {"name": "Test Author", "email": "test@example.com"},
+        "state": "new",
+        "web_url": f"https://example.com/patch/{patch_id}",
+        "mbox": mbox_url,
+    }
+    patch_data.update(overrides)
+    mocked_responses.add(responses.GET, f"https://patchwork.kernel.org/api/patches/{patch_id}/", json=patch_data)
+    mocked_responses.add(responses.GET, mbox_url, body=mbox_body)
+
+
 class TestEngagementAnalysis:
     """Test the engagement analysis functionality - high regression risk"""
 
-    def test_extract_version_from_series_name(self):
-        """Test version number extraction from patch series names"""
-        analyzer = ClaudeAnalyzer("fake-api-key")
-
-        # Create mock series with different version patterns
-        test_cases = [
+    @pytest.mark.parametrize(
+        "series_name,expected_version",
+        [
             ("[v7] drm: Add UAPI for the Asahi driver", 7),
             ("rust: Add bug/warn abstractions v3", 3),
             ("[PATCH v12 1/5] rust: kernel: add basic support", 12),
             ("rust: kernel: device: Add support", 1),  # No version = v1
             ("[RFC v2] rust: experimental feature", 2),
-        ]
-
-        for series_name, expected_version in test_cases:
-            series = Mock()
-            series.name = series_name
-            series.date = datetime.now(timezone.utc)
-
-            result = analyzer._analyze_engagement(series, [])
-            assert result["version"] == expected_version, f"Failed for '{series_name}'"
+            ("[PATCH V4] rust: upper-case marker", 4),
+            ("rust: media: add v4l2 bindings", 1),  # Not a version marker
+            ("rust: add dev2 device support", 1),
+        ],
+    )
+    def test_extract_version_from_series_name(self, analyzer, series_name, expected_version):
+        """Test version number extraction from patch series names"""
+        result = analyzer._analyze_engagement(_series(name=series_name), [])
+        assert result["version"] == expected_version
 
-    def test_extract_endorsements_from_patch_content(self):
+    def test_extract_endorsements_from_patch_content(self, analyzer):
         """Test parsing of sign-offs, acks, reviews from patch content"""
-        analyzer = ClaudeAnalyzer("fake-api-key")
 
         # Create mock patch with various endorsements
         patch_content = """
@@ -55,12 +178,9 @@ class TestEngagementAnalysis:
         Signed-off-by: Eve Committer <eve@kernel.org>
         """
 
-        mock_patch = Mock()
-        mock_patch.content = patch_content
+        mock_patch = _patch(content=patch_content)
 
-        series = Mock()
-        series.name = "test series"
-        series.date = datetime.now(timezone.utc)
+        series = _series(name="test series")
 
         result = analyzer._analyze_engagement(series, [mock_patch])
 
@@ -76,63 +196,107 @@ class TestEngagementAnalysis:
         assert "Carol Maintainer" in endorsements["acked_by"]
         assert "Dave Tester" in endorsements["tested_by"]
 
-    def test_extract_name_from_endorsement_line(self):
-        """Test name extraction from various endorsement line formats"""
-        analyzer = ClaudeAnalyzer("fake-api-key")
+        # Repeat calls for the same series and patches reuse the parsed endorsements
+        assert analyzer._analyze_engagement(series, [mock_patch])["endorsements"] is endorsements
+
+        # The export summary reduces names to counts
+        summary = analyzer._engagement_summary(series, [mock_patch])
+        assert summary["endorsements"] == {"signed_off_by": 2, "acked_by": 1, "reviewed_by": 1, "tested_by": 1}
+
+    def test_endorsement_trailer_variants(self, analyzer):
+        """Test trailers in mixed case, without an email, with CRLF endings, and duplicated across patches"""
+        patches = [
+            _patch(content="signed-off-by: Alice Author <alice@example.com>\nACKED-BY: Carol Maintainer\n"),
+            _patch(content="Signed-off-by: Alice Author <alice@example.com>\nNot-a-trailer: Zed <zed@example.com>\n"),
+            _patch(content="Acked-by: Carol Maintainer\r\nSigned-off-by: Alice Author <alice@example.com>\r\n"),
+        ]
+
+        result = analyzer._analyze_engagement(_series(name="test series"), patches)
+
+        assert result["endorsements"] == {
+            "signed_off_by": ["Alice Author"],
+            "acked_by": ["Carol Maintainer"],
+            "reviewed_by": [],
+            "tested_by": [],
+        }
+
+    def test_endorsements_ignore_diff(self, analyzer):
+        """Test that trailer-like lines after the commit message are not counted"""
+        content = (
+            "Subject: [PATCH] docs: describe trailers\n\n"
+            "Signed-off-by: Alice Author <alice@example.com>\n"
+            "---\n"
+            " Documentation/process/submitting-patches.rst | 1 +\n"
+            "diff --git a/Documentation/process/submitting-patches.rst b/Documentation/process/submitting-patches.rst\n"
+            "@@ -1,2 +1,3 @@\n"
+            " Reviewed-by: Example Reviewer <reviewer@example.com>\n"
+        )
 
-        test_cases = [
+        result = analyzer._analyze_engagement(_series(name="docs series"), [_patch(content=content)])
+
+        assert result["endorsements"]["signed_off_by"] == ["Alice Author"]
+        assert result["endorsements"]["reviewed_by"] == []
+
+    @pytest.mark.parametrize(
+        "line,expected_name",
+        [
             ("Signed-off-by: John Doe <john@example.com>", "John Doe"),
-            (
-                "Acked-by: Jane Smith<jane@kernel.org>",
-                "Jane Smith",
-            ),  # No space before <
+            ("Acked-by: Jane Smith<jane@kernel.org>", "Jane Smith"),  # No space before <
             ("Reviewed-by: Bob O'Connor <bob.oconnor@company.com>", "Bob O'Connor"),
             ("Tested-by: Multi Word Name <multi@test.org>", "Multi Word Name"),
             ("Signed-off-by: SingleName <single@example.com>", "SingleName"),
             ("Acked-by: Name-With-Dashes <dashes@test.com>", "Name-With-Dashes"),
-        ]
-
-        for line, expected_name in test_cases:
-            result = analyzer._extract_name_from_line(line)
-            assert result == expected_name, f"Failed for '{line}'"
+            ("Tested-by: Plain Name  ", "Plain Name"),  # No email
+            ("Acked-by: Carol Maintainer\r", "Carol Maintainer"),  # CRLF line ending
+            ("No colon here", ""),
+        ],
+    )
+    def test_extract_name_from_endorsement_line(self, analyzer, line, expected_name):
+        """Test name extraction from various endorsement line formats"""
+        assert analyzer._extract_name_from_line(line) == expected_name
 
-    def test_days_since_posting_calculation(self):
+    def test_days_since_posting_calculation(self, analyzer):
         """Test age calculation with timezone handling"""
-        from freezegun import freeze_time
+        now = FIXED_NOW
+
+        # Test patch from 5 days ago, measured against an injected reference time
+        series = _series(name="test", date=datetime(2025, 8, 22, 12, 0, 0, tzinfo=timezone.utc))
+        result = analyzer._analyze_engagement(series, [], now=now)
+        assert result["days_since_posting"] == 5
+
+        # Naive series dates are treated as UTC
+        series = _series(name="test", date=datetime(2025, 8, 17, 12, 0, 0))
+        assert analyzer._analyze_engagement(series, [], now=now)["days_since_posting"] == 10
+
+    def test_days_since_posting_follows_reference_time(self, analyzer):
+        """Test that memoized engagement is still measured against each call's reference time"""
+        series = _series(name="test", date=datetime(2025, 8, 22, 12, 0, 0, tzinfo=timezone.utc))
+        patches = [_patch(content="Acked-by: Carol Maintainer <carol@kernel.org>\n")]
+
+        first = analyzer._analyze_engagement(series, patches, now=datetime(2025, 8, 23, 12, 0, 0, tzinfo=timezone.utc))
+        later = analyzer._analyze_engagement(series, patches, now=datetime(2025, 9, 23, 12, 0, 0, tzinfo=timezone.utc))
 
-        analyzer = ClaudeAnalyzer("fake-api-key")
+        assert first["days_since_posting"] == 1
+        assert later["days_since_posting"] == 32
+        assert later["endorsements"] == first["endorsements"]
 
-        # Freeze time for predictable testing
-        with freeze_time("2025-08-27 12:00:00"):
-            # Test patch from 5 days ago
-            past_date = datetime(2025, 8, 22, 12, 0, 0, tzinfo=timezone.utc)
-            series = Mock()
-            series.name = "test"
-            series.date = past_date
+    def test_days_since_posting_defaults_to_clock(self, analyzer, monkeypatch):
+        """Test that ages are measured from the module clock when no reference time is given"""
+        monkeypatch.setattr("rust_patch_monitor._utcnow", lambda: FIXED_NOW)
 
-            result = analyzer._analyze_engagement(series, [])
-            assert result["days_since_posting"] == 5
+        series = _series(name="test", date=datetime(2025, 8, 22, 12, 0, 0, tzinfo=timezone.utc))
+        assert analyzer._analyze_engagement(series, [])["days_since_posting"] == 5
 
 
 class TestTokenUsageCapture:
     """Test token usage capture from Claude API responses"""
 
-    def test_analyze_patchset_captures_token_usage(self):
+    def test_analyze_patchset_captures_token_usage(self, analyzer):
         """Test that analyze_patchset returns both analysis and token usage"""
-        analyzer = ClaudeAnalyzer("fake-api-key")
 
         # Create mock data
-        series = Mock()
-        series.name = "Test Series"
-        series.submitter = {"name": "Test Author", "email": "test@example.com"}
-        series.date = datetime(2025, 8, 27, tzinfo=timezone.utc)
-        series.total = 1
-        series.web_url = "https://example.com/series/1"
-
-        mock_patch = Mock()
-        mock_patch.name = "Test Patch"
-        mock_patch.content = "Test patch content"
-        mock_patch.id = 123
+        series = _series(submitter={"name": "Test Author", "email": "test@example.com"})
+        mock_patch = _patch()
 
         with patch("rust_patch_monitor.ClaudeAnalyzer._analyze_engagement") as mock_engagement:
             mock_engagement.return_value = {
@@ -148,10 +312,10 @@ class TestTokenUsageCapture:
 
             # Mock Claude API client with realistic response structure
             with patch.object(analyzer, "client") as mock_client:
-                mock_response = Mock()
-                mock_response.content = [Mock(text="Test analysis content")]
-                mock_response.usage = Mock(input_tokens=1000, output_tokens=100)
-                mock_client.messages.create.return_value = mock_response
+                mock_client.messages.create.return_value = _Response(
+                    content=[_TextBlock("Test analysis content")],
+                    usage=_Usage(input_tokens=1000, output_tokens=100, cache_read_input_tokens=2500),
+                )
 
                 # Call analyze_patchset
                 result = analyzer.analyze_patchset(series, [mock_patch], include_comments=False)
@@ -170,13 +334,18 @@ class TestTokenUsageCapture:
                 assert token_usage["output_tokens"] == 100
                 assert token_usage["model"] == "claude-sonnet-4-20250514"
 
-    def test_bulk_analysis_aggregates_token_usage(self):
+                # Cached prompt prefix reads and writes are reported separately from fresh input
+                assert token_usage["cache_read_input_tokens"] == 2500
+                assert token_usage["cache_creation_input_tokens"] == 0
+
+                # The prompt is sent as one plain user message headed with the series name
+                prompt = mock_client.messages.create.call_args.kwargs["messages"][0]["content"]
+                assert "# Executive Brief: Test Series" in prompt
+
+    def test_bulk_analysis_aggregates_token_usage(self, cli_runner, web_ui_dir):
         """Test that bulk analysis properly aggregates token usage across multiple series"""
-        from click.testing import CliRunner
         from rust_patch_monitor import cli
 
-        runner = CliRunner()
-
         # Mock the entire pipeline with realistic token usage
         with patch("rust_patch_monitor.PatchworkClient") as MockClient, patch(
             "rust_patch_monitor.ClaudeAnalyzer"
@@ -184,18 +353,11 @@ class TestTokenUsageCapture:
 
             # Setup mock client
             mock_client_instance = MockClient.return_value
-            mock_series = Mock()
-            mock_series.id = 1
-            mock_series.name = "Test Series"
-            mock_series.submitter = {"name": "Test", "email": "test@example.com"}
-            mock_series.date = datetime.now(timezone.utc)
-            mock_series.total = 1
-            mock_series.web_url = "https://example.com"
-            mock_series.patches = [{"id": 1, "name": "Test patch"}]
+            mock_series = _series()
 
             mock_client_instance.get_rust_for_linux_project_id.return_value = "rust-for-linux"
             mock_client_instance.get_recent_series.return_value = [mock_series]
-            mock_client_instance.get_patch_content.return_value = Mock(content="test", id=1)
+            mock_client_instance.get_patches_content.return_value = [_patch(content="test", id=1)]
 
             # Setup mock analyzer with token usage
             mock_analyzer_instance = MockAnalyzer.return_value
@@ -207,105 +369,171 @@ class TestTokenUsageCapture:
                     "model": "claude-sonnet-4-20250514",
                 },
             }
-            mock_analyzer_instance._analyze_engagement.return_value = {
+            mock_analyzer_instance._engagement_summary.return_value = {
                 "version": 1,
                 "days_since_posting": 0,
                 "endorsements": {
-                    "signed_off_by": [],
-                    "acked_by": [],
-                    "reviewed_by": [],
-                    "tested_by": [],
+                    "signed_off_by": 0,
+                    "acked_by": 0,
+                    "reviewed_by": 0,
+                    "tested_by": 0,
                 },
             }
 
             # Run bulk analysis command
-            with runner.isolated_filesystem():
-                # Create web-ui directory structure
-                import os
-
-                os.makedirs("web-ui/src/data", exist_ok=True)
-
-                result = runner.invoke(
-                    cli,
-                    [
-                        "analyze-bulk",
-                        "--days",
-                        "7",
-                        "--max-patches",
-                        "1",
-                        "--claude-key",
-                        "test-key",
-                        "--no-comments",
-                    ],
-                )
-
-                # Should succeed and show token usage
-                assert result.exit_code == 0
-                assert "📊 Tokens:" in result.output
-                assert "1000 in / 100 out" in result.output
+            result = cli_runner.invoke(
+                cli,
+                [
+                    "analyze-bulk",
+                    "--days",
+                    "7",
+                    "--max-patches",
+                    "1",
+                    "--claude-key",
+                    "test-key",
+                    "--no-comments",
+                ],
+            )
+
+            # Should succeed and show token usage
+            assert result.exit_code == 0
+            assert "📊 Tokens:" in result.output
+            assert "1000 in / 100 out" in result.output
+
+            # The web UI export carries the aggregated token usage in its metadata
+            web_data = json.loads((web_ui_dir / "web-ui/src/data/patches.json").read_text())
+            assert web_data["metadata"]["token_usage"]["total_input_tokens"] == 1000
+            assert web_data["metadata"]["token_usage"]["total_output_tokens"] == 100
+            assert web_data["metadata"]["token_usage"]["analysis_count"] == 1
 
     def test_json_export_includes_token_metadata(self):
-        """Test that JSON export includes aggregated token usage in metadata"""
+        """Test that token usage is aggregated across analysis results for the export metadata"""
+        from rust_patch_monitor import _total_token_usage
 
         # Create a temporary analysis result with token usage
         analysis_results = [
             {
-                "series": Mock(id=1, name="Test Series 1"),
+                "series": _series(name="Test Series 1"),
                 "analysis": "Analysis 1",
-                "patches": [Mock()],
+                "patches": [_patch()],
                 "token_usage": {"input_tokens": 800, "output_tokens": 75},
             },
             {
-                "series": Mock(id=2, name="Test Series 2"),
+                "series": _series(name="Test Series 2"),
                 "analysis": "Analysis 2",
-                "patches": [Mock()],
+                "patches": [_patch()],
                 "token_usage": {"input_tokens": 1200, "output_tokens": 125},
             },
         ]
 
-        # Mock the analyzer and create export data structure
-        total_input = sum(r["token_usage"]["input_tokens"] for r in analysis_results)
-        total_output = sum(r["token_usage"]["output_tokens"] for r in analysis_results)
+        totals = _total_token_usage(analysis_results)
 
-        export_data = {
-            "metadata": {
-                "generated_at": datetime.now().isoformat(),
-                "project": "rust-for-linux",
-                "total_series": len(analysis_results),
-                "token_usage": {
-                    "total_input_tokens": total_input,
-                    "total_output_tokens": total_output,
-                    "model": "claude-sonnet-4-20250514",
-                    "analysis_count": len(analysis_results),
-                },
-            }
+        # Verify token aggregation; counts absent from every result sum to 0
+        assert totals["input_tokens"] == 2000
+        assert totals["output_tokens"] == 200
+        assert totals["cache_read_input_tokens"] == 0
+
+
+class TestJSONExport:
+    """Test the incremental JSON export writer"""
+
+    def test_write_json_export_produces_valid_json(self, tmp_path):
+        """Test that streamed export records form one valid JSON document"""
+        from rust_patch_monitor import _write_json_export
+
+        output = tmp_path / "patches.json"
+        records = ({"id": i, "date": datetime(2025, 8, 27, tzinfo=timezone.utc)} for i in range(3))
+
+        _write_json_export(output, {"total_series": 3}, records)
+
+        data = json.loads(output.read_text())
+        assert data["metadata"] == {"total_series": 3}
+        assert [series["id"] for series in data["patch_series"]] == [0, 1, 2]
+
+        _write_json_export(output, {"total_series": 0}, iter([]))
+        assert json.loads(output.read_text())["patch_series"] == []
+
+    def test_write_json_export_failure_keeps_previous_file(self, tmp_path):
+        """Test that a failing record source leaves the previous export and no temporary file"""
+        from rust_patch_monitor import _write_json_export
+
+        output = tmp_path / "patches.json"
+        output.write_text("previous")
+
+        def failing_records():
+            yield {"id": 0}
+            raise RuntimeError("analysis failed")
+
+        with pytest.raises(RuntimeError):
+            _write_json_export(output, {"total_series": 2}, failing_records())
+
+        assert output.read_text() == "previous"
+        assert [path.name for path in tmp_path.iterdir()] == ["patches.json"]
+
+    def test_write_json_export_compact_by_default(self, tmp_path):
+        """Test that exports are compact unless pretty output is requested"""
+        from rust_patch_monitor import _write_json_export
+
+        output = tmp_path / "patches.json"
+        records = [{"id": 1, "engagement": {"version": 2}}, {"id": 2, "engagement": {"version": 1}}]
+
+        _write_json_export(output, {"total_series": 2}, iter(records))
+        compact = output.read_text()
+        assert compact == (
+            '{"metadata":{"total_series":2},"patch_series":'
+            '[{"id":1,"engagement":{"version":2}},{"id":2,"engagement":{"version":1}}]}\n'
+        )
+
+        _write_json_export(output, {"total_series": 2}, iter(records), pretty=True)
+        pretty = output.read_text()
+        assert '\n  "engagement": {\n' in pretty
+        assert json.loads(pretty) == json.loads(compact)
+
+    def test_series_record_fields(self):
+        """Test the shared per-series export record, including a missing submitter"""
+        from rust_patch_monitor import PatchSeries, _series_record
+
+        series = PatchSeries(
+            id=7,
+            name="[PATCH v2 0/1] rust: test",
+            date=datetime(2025, 8, 27, tzinfo=timezone.utc),
+            submitter=None,
+            total=1,
+            patches=[],
+            cover_letter=None,
+            web_url="https://example.com/series/7/",
+        )
+
+        record = _series_record(series, {"version": 2})
+        assert record == {
+            "id": 7,
+            "name": "[PATCH v2 0/1] rust: test",
+            "date": "2025-08-27T00:00:00+00:00",
+            "submitter": {"name": "Unknown", "email": ""},
+            "total_patches": 1,
+            "web_url": "https://example.com/series/7/",
+            "engagement": {"version": 2},
         }
 
-        # Verify token aggregation
-        assert export_data["metadata"]["token_usage"]["total_input_tokens"] == 2000
-        assert export_data["metadata"]["token_usage"]["total_output_tokens"] == 200
-        assert export_data["metadata"]["token_usage"]["analysis_count"] == 2
+    def test_status_from_analysis_keyword_priority(self):
+        """Test that status keywords are matched case-insensitively in priority order"""
+        from rust_patch_monitor import _status_from_analysis
+
+        assert _status_from_analysis("A strategic series, now READY for merge") == "Ready"
+        assert _status_from_analysis("Strategic work that has Stalled") == "Stalled"
+        assert _status_from_analysis("Strategic development") == "Strategic Development"
+        assert _status_from_analysis("Nothing notable") == "Under Review"
 
 
 class TestXMLGeneration:
     """Test XML prompt generation - critical for Claude integration"""
 
-    def test_xml_structure_validity(self):
+    def test_xml_structure_validity(self, analyzer):
         """Ensure generated XML is well-formed"""
-        analyzer = ClaudeAnalyzer("fake-api-key")
 
         # Create mock data
-        series = Mock()
-        series.name = "Test Series"
-        series.submitter = {"name": "Test Author", "email": "test@example.com"}
-        series.date = datetime(2025, 8, 27, tzinfo=timezone.utc)
-        series.total = 1
-        series.web_url = "https://example.com/series/1"
-
-        mock_patch = Mock()
-        mock_patch.name = "Test Patch"
-        mock_patch.content = "Test patch content"
-        mock_patch.id = 123
+        series = _series(submitter={"name": "Test Author", "email": "test@example.com"})
+        mock_patch = _patch()
 
         # Generate XML (without calling Claude API)
         with patch("rust_patch_monitor.ClaudeAnalyzer._analyze_engagement") as mock_engagement:
@@ -322,10 +550,9 @@ class TestXMLGeneration:
 
             # Call analyze_patchset but intercept before API call
             with patch.object(analyzer, "client") as mock_client:
-                mock_response = Mock()
-                mock_response.content = [Mock(text="Test response")]
-                mock_response.usage = Mock(input_tokens=1000, output_tokens=100)
-                mock_client.messages.create.return_value = mock_response
+                mock_client.messages.create.return_value = _Response(
+                    content=[_TextBlock("Test response")], usage=_Usage(input_tokens=1000, output_tokens=100)
+                )
 
                 result = analyzer.analyze_patchset(series, [mock_patch], include_comments=False)
 
@@ -338,157 +565,377 @@ class TestXMLGeneration:
                 call_args = mock_client.messages.create.call_args
                 prompt = call_args[1]["messages"][0]["content"]
 
-                # Check for key XML structures
-                assert "<patchset>" in prompt
-                assert "</patchset>" in prompt
-                assert "<metadata>" in prompt
-                assert "<engagement_analysis>" in prompt
-                assert "<patches>" in prompt
+                # The patchset context must parse as XML and contain the key sections
+                root = _parse_patchset(prompt)
+                assert root.find("metadata") is not None
+                assert root.find("engagement_analysis") is not None
+                assert root.find("patches") is not None
                 assert "<analysis_request>" in prompt
 
+    def test_xml_escapes_special_characters(self, analyzer):
+        """Ensure names and patch content with XML metacharacters keep the context well-formed"""
+        series = _series(
+            name="rust: add Vec<T> & Option<T> helpers",
+            submitter={"name": 'Jane "JD" Doe', "email": "jane@example.com"},
+            web_url="https://example.com/?series=1&state=*",
+        )
+        mock_patch = _patch(
+            name="rust: use <T>", content="fn f<T>(x: &T) {}\nSigned-off-by: Jane Doe <jane@example.com>"
+        )
+
+        with patch.object(analyzer, "client") as mock_client:
+            mock_client.messages.create.return_value = _Response(content=[_TextBlock("Test response")])
+
+            analyzer.analyze_patchset(series, [mock_patch], include_comments=False)
+
+            prompt = mock_client.messages.create.call_args[1]["messages"][0]["content"]
+            root = _parse_patchset(prompt)
+
+            assert root.find("metadata/title").text == series.name
+            assert root.find("metadata/author").get("name") == 'Jane "JD" Doe'
+            assert "fn f<T>(x: &T) {}" in root.find("patches/patch/content").text
+
+    def test_xml_handles_null_names(self, analyzer):
+        """Ensure null submitter names and emails from Patchwork fall back to placeholders"""
+        series = _series(submitter={"name": None, "email": None})
+        comments = [{"submitter": {"name": None}, "date": "2025-08-26T10:00:00", "content": "Looks good"}]
+        client = SimpleNamespace(get_patches_comments=lambda patch_ids: [comments for _ in patch_ids])
+
+        with patch.object(analyzer, "client") as mock_client:
+            mock_client.messages.create.return_value = _Response(content=[_TextBlock("Test response")])
+
+            analyzer.analyze_patchset(series, [_patch()], client=client)
+
+            prompt = mock_client.messages.create.call_args[1]["messages"][0]["content"]
+            root = _parse_patchset(prompt)
+
+            assert root.find("metadata/author").get("name") == "Unknown"
+            assert root.find("metadata/author").get("email") == ""
+            assert root.find("patches/patch/comments/comment").get("author") == "Unknown"
+
 
 class TestPatchworkClient:
     """Test API interactions with mocked responses"""
 
-    @responses.activate
-    def test_rust_project_detection(self):
+    def test_rust_project_detection(self, mocked_responses, pw_client):
         """Test finding the rust-for-linux project"""
 
         # Mock successful response
-        responses.add(
+        mocked_responses.add(
             responses.GET,
             "https://patchwork.kernel.org/api/series/?project=rust-for-linux&per_page=1",
             json=[],
             status=200,
         )
 
-        client = PatchworkClient()
-        project_id = client.get_rust_for_linux_project_id()
+        project_id = pw_client.get_rust_for_linux_project_id()
         assert project_id == "rust-for-linux"
 
-    @responses.activate
-    def test_series_filtering_applied_patches(self):
-        """Test that applied patches are properly filtered"""
+        # The lookup result is cached on the client
+        assert pw_client.get_rust_for_linux_project_id() == "rust-for-linux"
+        assert len(mocked_responses.calls) == 1
 
-        # Mock series API response
-        mock_series_data = [
-            {
-                "id": 1,
-                "name": "Applied series",
-                "date": "2025-08-20T10:00:00Z",
-                "submitter": {"name": "Test Author", "email": "test@example.com"},
-                "total": 1,
-                "patches": [{"id": 1, "name": "[GIT,PULL] Rust fixes for 6.15"}],
-                "cover_letter": None,
-                "web_url": "https://example.com/series/1",
-            },
-            {
-                "id": 2,
-                "name": "rust: add new feature",
-                "date": "2025-08-20T10:00:00Z",
-                "submitter": {"name": "Test Author", "email": "test@example.com"},
-                "total": 1,
-                "patches": [{"id": 2, "name": "Regular patch"}],
-                "cover_letter": None,
-                "web_url": "https://example.com/series/2",
-            },
-        ]
+    def test_series_filtering_applied_patches(self, mocked_responses, pw_client, monkeypatch):
+        """Test that applied patches are properly filtered"""
+        # The mock series are dated relative to the fixed reference time
+        monkeypatch.setattr("rust_patch_monitor._utcnow", lambda: FIXED_NOW)
 
-        responses.add(
+        mocked_responses.add(
             responses.GET,
-            "https://patchwork.kernel.org/api/series/?project=rust-for-linux&ordering=-date&per_page=50&page=1",
-            json=mock_series_data,
+            "https://patchwork.kernel.org/api/series/?project=rust-for-linux&ordering=-date&per_page=50&page=1"
+            "&fields=id,name,date,submitter,total,patches,cover_letter,web_url",
+            body=MOCK_SERIES_BODY,
+            content_type="application/json",
             status=200,
         )
 
         # Mock empty response for page 2 to end pagination
-        responses.add(
+        mocked_responses.add(
             responses.GET,
-            "https://patchwork.kernel.org/api/series/?project=rust-for-linux&ordering=-date&per_page=50&page=2",
+            "https://patchwork.kernel.org/api/series/?project=rust-for-linux&ordering=-date&per_page=50&page=2"
+            "&fields=id,name,date,submitter,total,patches,cover_letter,web_url",
             json=[],
             status=200,
         )
 
-        client = PatchworkClient()
-
         # Test with include_applied=False (default)
-        series_list = client.get_recent_series("rust-for-linux", days=90, include_applied=False)
+        series_list = pw_client.get_recent_series("rust-for-linux", days=90, include_applied=False)
 
         # Should filter out GIT,PULL request but keep regular patch
         assert len(series_list) == 1
         assert "rust: add new feature" in series_list[0].name
 
-    @responses.activate
-    def test_patch_comments_fetching(self):
-        """Test comment fetching for patches"""
+        # The window is measured from the module clock, which both series predate by 7 days
+        assert pw_client.get_recent_series("rust-for-linux", days=5, include_applied=True) == []
 
-        mock_comments = [
-            {
-                "id": 1,
-                "submitter": {"name": "Reviewer One", "email": "reviewer1@example.com"},
-                "date": "2025-05-02T10:00:00Z",
-                "content": "This looks good but needs a small fix.",
-            },
+    def test_series_paging_stops_at_cutoff(self, mocked_responses, pw_client):
+        """Test that no further pages are requested once a series is older than the window"""
+        now = datetime.now(timezone.utc)
+        mock_series_data = [
             {
-                "id": 2,
-                "submitter": {"name": "Reviewer Two", "email": "reviewer2@example.com"},
-                "date": "2025-05-02T11:00:00Z",
-                "content": "I agree with the approach.",
-            },
+                "id": i,
+                "name": f"rust: series {i}",
+                "date": (now - timedelta(days=1 if i < 49 else 30)).isoformat(),
+                "submitter": {"name": "Test Author", "email": "test@example.com"},
+                "total": 1,
+                "patches": [{"id": i, "name": "Regular patch"}],
+                "cover_letter": None,
+                "web_url": f"https://example.com/series/{i}",
+            }
+            for i in range(50)
         ]
 
-        responses.add(
+        mocked_responses.add(
+            responses.GET,
+            "https://patchwork.kernel.org/api/series/?project=rust-for-linux&ordering=-date&per_page=50&page=1"
+            "&fields=id,name,date,submitter,total,patches,cover_letter,web_url",
+            json=mock_series_data,
+            status=200,
+        )
+
+        series_list = pw_client.get_recent_series("rust-for-linux", days=7)
+
+        # A full page ending in an old series must not trigger a page 2 request
+        assert len(series_list) == 49
+        assert len(mocked_responses.calls) == 1
+
+        # Patch entries can be trimmed at ingest while keeping the series total
+        trimmed = pw_client.get_recent_series("rust-for-linux", days=7, max_patches=0)
+        assert trimmed[0].patches == []
+        assert trimmed[0].total == 1
+
+    def test_patch_comments_fetching(self, mocked_responses, pw_client):
+        """Test comment fetching for patches"""
+
+        mocked_responses.add(
             responses.GET,
             "https://patchwork.kernel.org/api/patches/123/comments/",
-            json=mock_comments,
+            body=MOCK_COMMENTS_BODY,
+            content_type="application/json",
             status=200,
         )
 
-        client = PatchworkClient()
-        comments = client.get_patch_comments(123)
+        comments = pw_client.get_patch_comments(123)
 
         assert len(comments) == 2
         assert comments[0]["submitter"]["name"] == "Reviewer One"
         assert "looks good" in comments[0]["content"]
 
+        # Repeat lookups are served from the per-client cache
+        assert pw_client.get_patch_comments(123) == comments
+        assert len(mocked_responses.calls) == 1
+
+    def test_parallel_patch_fetching_preserves_order(self, mocked_responses, pw_client):
+        """Test concurrent patch fetching keeps input order and reports failures"""
+
+        for patch_id in (1, 2):
+            _register_patch(mocked_responses, patch_id, f"mbox {patch_id}")
+        mocked_responses.add(responses.GET, "https://patchwork.kernel.org/api/patches/3/", status=404)
+
+        errors = []
+        patches = pw_client.get_patches_content([2, 3, 1], on_error=lambda patch_id, e: errors.append(patch_id))
+
+        assert [p.id for p in patches] == [2, 1]
+        assert patches[0].content == "mbox 2"
+        assert errors == [3]
+
+    def test_patch_mbox_download_is_bounded(self, mocked_responses, pw_client):
+        """Test that only the first max_bytes of a patch mbox are read"""
+
+        _register_patch(mocked_responses, 1, "x" * 100)
+
+        assert pw_client.get_patch_content(1, max_bytes=10).content == "x" * 10
+        assert pw_client.get_patch_content(1, max_bytes=None).content == "x" * 100
+
+    def test_patch_message_only_skips_diff(self, mocked_responses, pw_client):
+        """Test that message_only stops reading the mbox at the end of the commit message"""
+
+        mbox = (
+            "Subject: rust: fix\n\nSigned-off-by: Alice Author <alice@example.com>\n"
+            "---\n diff stat\ndiff --git a/x b/x\n"
+        )
+        _register_patch(mocked_responses, 1, mbox)
+
+        patch_obj = pw_client.get_patch_content(1, message_only=True)
+
+        assert patch_obj.content == "Subject: rust: fix\n\nSigned-off-by: Alice Author <alice@example.com>"
+
+    def test_patch_message_only_is_bounded(self, mocked_responses, pw_client):
+        """Test that message_only still stops at max_bytes for mails without a diff"""
+
+        _register_patch(mocked_responses, 1, "line\n" * 100, name="[GIT PULL] Rust for v6.18")
+
+        patch_obj = pw_client.get_patch_content(1, max_bytes=12, message_only=True)
+
+        assert patch_obj.content == "line\nline\nli"
+
+    def test_patch_disk_cache(self, mocked_responses, tmp_path):
+        """Test that patch content and comments are served from the on-disk cache"""
+
+        _register_patch(mocked_responses, 1, "mbox 1")
+        mocked_responses.add(
+            responses.GET,
+            "https://patchwork.kernel.org/api/patches/1/comments/",
+            json=[{"id": 1, "content": "Looks good"}],
+            status=200,
+        )
+
+        PatchworkClient(cache_dir=str(tmp_path)).get_patch_content(1)
+        PatchworkClient(cache_dir=str(tmp_path)).get_patch_comments(1)
+        assert len(mocked_responses.calls) == 3
+
+        # A fresh client with the same cache directory makes no requests
+        client = PatchworkClient(cache_dir=str(tmp_path))
+        patch_obj = client.get_patch_content(1)
+        assert patch_obj.content == "mbox 1"
+        assert patch_obj.date == datetime(2025, 8, 20, 10, 0, tzinfo=timezone.utc)
+        assert client.get_patch_comments(1) == [{"id": 1, "content": "Looks good"}]
+        assert len(mocked_responses.calls) == 3
+
+    def test_disk_cache_drops_expired_entries(self, tmp_path):
+        """Test that expired entries are deleted when read and old entries are pruned on the first write"""
+        week_ago = time.time() - 8 * 24 * 3600
+        client = PatchworkClient(cache_dir=str(tmp_path))
+        cache_dir = tmp_path / os.path.basename(client.cache_dir)
+        cache_dir.mkdir()
+        for name in ("comments-1.json", "patch-2-full.json"):
+            (cache_dir / name).write_text("[]")
+            os.utime(cache_dir / name, (week_ago, week_ago))
+
+        assert client._read_cache("comments-1.json", timedelta(hours=1)) is None
+        assert not (cache_dir / "comments-1.json").exists()
+
+        client._write_cache("project-id.json", {"id": "rust-for-linux"})
+        assert sorted(path.name for path in cache_dir.iterdir()) == ["project-id.json"]
+
+    def test_project_id_disk_cache(self, mocked_responses, tmp_path):
+        """Test that the project lookup is reused by later clients sharing the cache directory"""
+        mocked_responses.add(
+            responses.GET,
+            "https://patchwork.kernel.org/api/series/?project=rust-for-linux&per_page=1",
+            json=[],
+            status=200,
+        )
+
+        assert PatchworkClient(cache_dir=str(tmp_path)).get_rust_for_linux_project_id() == "rust-for-linux"
+        assert PatchworkClient(cache_dir=str(tmp_path)).get_rust_for_linux_project_id() == "rust-for-linux"
+        assert len(mocked_responses.calls) == 1
+
+        # Another Patchwork instance keeps its own entries in the same cache directory
+        mocked_responses.add(
+            responses.GET, "https://patchwork.example.org/api/series/?project=rust-for-linux&per_page=1", status=404
+        )
+        mocked_responses.add(
+            responses.GET,
+            "https://patchwork.example.org/api/projects/",
+            json=[{"id": 7, "name": "Rust", "link_name": "rust"}],
+        )
+        other = PatchworkClient(base_url="https://patchwork.example.org/api", cache_dir=str(tmp_path))
+        assert other.get_rust_for_linux_project_id() == 7
+        assert len(mocked_responses.calls) == 3
+
+    def test_sample_series_engagement(self, mocked_responses, pw_client, analyzer):
+        """Test fetching the sample series and its patches through to the engagement summary"""
+        mocked_responses.add(
+            responses.GET,
+            "https://patchwork.kernel.org/api/series/",
+            body=SAMPLE_SERIES_BODY,
+            content_type="application/json",
+        )
+        for patch_id in (1, 2):
+            _register_patch(
+                mocked_responses,
+                patch_id,
+                SAMPLE_PATCH_CONTENT,
+                date="2025-04-29T10:00:00Z",
+                submitter=SAMPLE_SERIES_RESPONSE["submitter"],
+            )
+
+        # A window wide enough to include the sample series whatever the current date
+        (series,) = pw_client.get_recent_series("rust-for-linux", days=36500)
+        patches = pw_client.get_patches_content([patch_ref["id"] for patch_ref in series.patches], message_only=True)
+
+        summary = analyzer._engagement_summary(series, patches, now=FIXED_NOW)
+        assert summary["version"] == 3
+        assert summary["days_since_posting"] == 120
+        assert summary["endorsements"] == {"signed_off_by": 1, "acked_by": 1, "reviewed_by": 1, "tested_by": 0}
+
+    def test_clients_share_session(self):
+        """Test that clients reuse one pooled session unless given their own"""
+        import requests
+
+        assert PatchworkClient().session is PatchworkClient().session
+
+        # The shared session keeps connections alive and asks for compressed responses
+        shared = PatchworkClient().session
+        assert shared.headers["Connection"] == "keep-alive"
+        assert "gzip" in shared.headers["Accept-Encoding"]
+        assert shared.get_adapter("https://patchwork.kernel.org").max_retries.total == 3
+
+        own_session = requests.Session()
+        assert PatchworkClient(session=own_session).session is own_session
+
 
 class TestCLIInterface:
     """Test command-line interface"""
 
-    def test_cli_help_output(self):
+    @pytest.mark.parametrize(
+        "args,expected",
+        [
+            (["--help"], ("Rust for Linux Patch Monitor",)),
+            (
+                ["analyze", "--help"],
+                ("--days", "--include-applied", "--no-comments", "--max-patches", "--claude-key", "--output"),
+            ),
+            (["analyze-bulk", "--help"], ("--days", "--max-series", "--summary-report", "--pretty")),
+            (["export-json", "--help"], ("--days", "--include-applied", "--output", "--pretty")),
+        ],
+    )
+    def test_cli_help_output(self, cli_runner, args, expected):
         """Ensure help output contains all expected options"""
-        from click.testing import CliRunner
         from rust_patch_monitor import cli
 
-        runner = CliRunner()
-
-        # Test main help
-        result = runner.invoke(cli, ["--help"])
+        result = cli_runner.invoke(cli, args)
         assert result.exit_code == 0
-        assert "Rust for Linux Patch Monitor" in result.output
+        # One pass over the help text for all options; longest first so no needle shadows another it prefixes
+        needles = re.compile("|".join(map(re.escape, sorted(expected, key=len, reverse=True))))
+        assert set(needles.findall(result.output)) == set(expected)
 
-        # Test analyze command help
-        result = runner.invoke(cli, ["analyze", "--help"])
-        assert result.exit_code == 0
-        assert "--days" in result.output
-        assert "--include-applied" in result.output
-        assert "--no-comments" in result.output
-        assert "--max-patches" in result.output
-        assert "--claude-key" in result.output
-        assert "--output" in result.output
-
-    def test_cli_missing_api_key_handling(self):
+    def test_cli_missing_api_key_handling(self, cli_runner):
         """Test graceful handling of missing API key"""
-        from click.testing import CliRunner
         from rust_patch_monitor import cli
 
-        runner = CliRunner()
-
-        # Should fail gracefully when no API key provided
-        result = runner.invoke(cli, ["analyze"])
+        # Should fail gracefully when no API key provided, even if one is set in the environment
+        result = cli_runner.invoke(cli, ["analyze"], env={"ANTHROPIC_API_KEY": None})
         assert result.exit_code == 0  # Click doesn't exit(1) by default
         assert "Claude API key is required" in result.output
 
+    def test_analyze_fetches_every_patch(self, cli_runner):
+        """Test that analyze fetches the whole series and leaves --max-patches to the prompt"""
+        from rust_patch_monitor import cli
+
+        with patch("rust_patch_monitor.PatchworkClient") as MockClient, patch(
+            "rust_patch_monitor.ClaudeAnalyzer"
+        ) as MockAnalyzer:
+            mock_client_instance = MockClient.return_value
+            mock_client_instance.get_rust_for_linux_project_id.return_value = "rust-for-linux"
+            mock_client_instance.get_recent_series.return_value = [
+                _series(total=3, patches=[{"id": 1}, {"id": 2}, {"id": 3}])
+            ]
+            MockAnalyzer.return_value.analyze_patchset.return_value = {
+                "analysis": "Test analysis",
+                "token_usage": {"input_tokens": 10, "output_tokens": 1},
+            }
+
+            result = cli_runner.invoke(
+                cli, ["analyze", "--max-patches", "1", "--no-comments", "--claude-key", "test-key"], input="1\n"
+            )
+
+            assert result.exit_code == 0
+            assert "max_patches" not in mock_client_instance.get_recent_series.call_args.kwargs
+            mock_client_instance.get_patches_content.assert_called_once_with([1, 2, 3])
+            assert MockAnalyzer.return_value.analyze_patchset.call_args.kwargs["max_patches"] == 1
+
 
 # Integration test data
 SAMPLE_PATCH_CONTENT = """
@@ -520,5 +967,50 @@ SAMPLE_SERIES_RESPONSE = {
     "web_url": "https://patchwork.kernel.org/project/rust-for-linux/list/?series=958022",
 }
 
+# Mocked Patchwork API payloads: one applied (GIT PULL) series and one regular series
+MOCK_SERIES_DATA = (
+    {
+        "id": 1,
+        "name": "Applied series",
+        "date": "2025-08-20T10:00:00Z",
+        "submitter": {"name": "Test Author", "email": "test@example.com"},
+        "total": 1,
+        "patches": [{"id": 1, "name": "[GIT,PULL] Rust fixes for 6.15"}],
+        "cover_letter": None,
+        "web_url": "https://example.com/series/1",
+    },
+    {
+        "id": 2,
+        "name": "rust: add new feature",
+        "date": "2025-08-20T10:00:00Z",
+        "submitter": {"name": "Test Author", "email": "test@example.com"},
+        "total": 1,
+        "patches": [{"id": 2, "name": "Regular patch"}],
+        "cover_letter": None,
+        "web_url": "https://example.com/series/2",
+    },
+)
+
+# Mocked review comments for patch 123
+MOCK_COMMENTS = (
+    {
+        "id": 1,
+        "submitter": {"name": "Reviewer One", "email": "reviewer1@example.com"},
+        "date": "2025-05-02T10:00:00Z",
+        "content": "This looks good but needs a small fix.",
+    },
+    {
+        "id": 2,
+        "submitter": {"name": "Reviewer Two", "email": "reviewer2@example.com"},
+        "date": "2025-05-02T11:00:00Z",
+        "content": "I agree with the approach.",
+    },
+)
+
+# Response bodies encoded once, so the mocked transport serves bytes without re-encoding per request
+MOCK_SERIES_BODY = json.dumps(MOCK_SERIES_DATA).encode("utf-8")
+MOCK_COMMENTS_BODY = json.dumps(MOCK_COMMENTS).encode("utf-8")
+SAMPLE_SERIES_BODY = json.dumps([SAMPLE_SERIES_RESPONSE]).encode("utf-8")
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])